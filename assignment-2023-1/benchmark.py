@@ -0,0 +1,157 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import tracemalloc
+from io import StringIO
+from time import perf_counter
+
+import lance_williams as lw
+
+# the function that builds the starting distances of every engine
+builders = {
+    "matrix" : lw.distanceMatrix,
+    "condensed" : lw.condensedDistances,
+    "heap" : lw.condensedDistances,
+    "line" : None,
+}
+if lw.np is not None :
+    builders["numpy"] = lw.numpyDistances
+
+def randomPoints(n, rng):
+    ''' Input:  n, the amount of numbers
+                rng, a random.Random
+        Output: a list of n integers, with some of them repeated & packed in groups so that
+                there are ties between distances '''
+    centers = [rng.randint(0, 100 * n) for i in range(max(1, n // 10))]
+    return [rng.choice(centers) + rng.randint(-n, n) for i in range(n)]
+
+def render(points, linkage):
+    ''' Input:  points, the clustered numbers
+                linkage, the joins of said numbers
+        Output: the text that the script prints for said joins '''
+    text = StringIO()
+    lw.writeLinkage(points, linkage, text)
+    return text.getvalue()
+
+def referencePhases(values, method):
+    ''' Input:  values, a sorted list of numbers
+                method, the specified method used for clustering data
+        Output: build, search, update, the seconds spent by the original implementation (matrixMerges) on building
+                the distances, on minIn & on rebuilding the matrix after every join '''
+    begin = perf_counter()
+    dist = lw.distanceMatrix(values)
+    build = perf_counter() - begin
+    search = update = 0
+    sizes = [1] * len(values)
+    while len(sizes) > 1:
+        begin = perf_counter()
+        minD,c1,c2 = lw.minIn(dist)
+        middle = perf_counter()
+        dist = lw.updateMatrix(dist, c1, c2, method, sizes)
+        search += middle - begin
+        update += perf_counter() - middle
+        sizes[c1] += sizes[c2]
+        sizes.pop(c2)
+    return build, search, update
+
+def measure(points, method, engine):
+    ''' Input:  points, a list of numbers
+                method, the specified method used for clustering data
+                engine, the name of an engine
+        Output: a dictionary with the seconds spent on building the distances & in total, the peak memory in bytes
+                and the linkage of the clustering '''
+    values = sorted(points)
+    build = None
+    if builders.get(engine) is not None :
+        begin = perf_counter()
+        builders[engine](values)
+        build = perf_counter() - begin
+    begin = perf_counter()
+    linkage = lw.cluster(points, method, engine)
+    total = perf_counter() - begin
+    tracemalloc.start() # measured in a second run, tracing slows the clustering down
+    lw.cluster(points, method, engine)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"build_s" : build, "total_s" : total, "peak_bytes" : peak, "linkage" : linkage}
+
+def oracle(runs, methods, engines, rng):
+    ''' Input:  runs, the amount of random inputs
+                methods, engines, the methods & engines to check
+                rng, a random.Random
+        Output: mismatches, a list with the (method, engine, points) for which an engine printed something
+                different than the original implementation (the matrix engine) '''
+    mismatches = []
+    for run in range(runs):
+        n = rng.randint(1, 40)
+        points = [rng.randint(-n // 2, n // 2) for i in range(n)] # small range, many ties
+        if run % 10 == 1 : # numbers that fit in 64 bits, with distances that do not (multiples of 2 ** 40, so that
+            # the distances & their sums are exact floats, and every engine finds the same ties)
+            points = [rng.randint(-n // 2, n // 2) * ((1 << 64) // (n + 1) >> 40 << 40) for i in range(n)]
+        if run % 10 == 2 : # floats, that must not be truncated to integers
+            points = [round(rng.uniform(-n, n), rng.randint(0, 3)) for i in range(n)]
+        for method in methods:
+            expected = render(points, lw.cluster(points, method, "matrix"))
+            for engine in engines:
+                if engine == "line" and method != "single" : continue
+                if render(points, lw.cluster(points, method, engine)) != expected :
+                    mismatches.append({"method" : method, "engine" : engine, "points" : points})
+    return mismatches
+
+def main(args):
+    ''' Input:  args, the command line arguments
+        Result: every engine is timed on random numbers of every size & method, checked against the
+                original implementation, and the results are printed as json '''
+    parser = argparse.ArgumentParser(description = 'benchmark the engines of lance_williams.py')
+    parser.add_argument('--sizes', type = int, nargs = '+', default = [100, 200, 400, 800], help = 'the amounts of numbers')
+    parser.add_argument('--methods', nargs = '+', default = lw.available, choices = lw.available)
+    parser.add_argument('--engines', nargs = '+', default = list(lw.engines), choices = list(lw.engines))
+    parser.add_argument('--reference-max', type = int, default = 400, help = 'the largest size the original (matrix) engine is run for')
+    parser.add_argument('--oracle-runs', type = int, default = 50, help = 'the amount of small random inputs every engine is checked on')
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('-o', dest = 'output', help = 'write the json in this file instead of stdout')
+    args = parser.parse_args(args[1:])
+    rng = random.Random(args.seed)
+
+    results = []
+    for n in args.sizes:
+        points = randomPoints(n, rng)
+        for method in args.methods:
+            expected = None
+            if n <= args.reference_max :
+                build,search,update = referencePhases(sorted(points), method)
+                results.append({"method" : method, "n" : n, "engine" : "reference",
+                                "build_s" : build, "search_s" : search, "update_s" : update,
+                                "total_s" : build + search + update})
+                expected = render(points, lw.cluster(points, method, "matrix"))
+            for engine in args.engines:
+                if engine == "line" and method != "single" : continue
+                if engine == "matrix" and n > args.reference_max : continue
+                result = measure(points, method, engine)
+                linkage = result.pop("linkage")
+                result.update({"method" : method, "n" : n, "engine" : engine,
+                               "identical" : None if expected is None else render(points, linkage) == expected})
+                results.append(result)
+                print(method, n, engine, round(result["total_s"],3), "s", file = sys.stderr)
+
+    mismatches = oracle(args.oracle_runs, args.methods, args.engines, rng)
+    report = {
+        "python" : platform.python_version(),
+        "numpy" : None if lw.np is None else lw.np.__version__,
+        "results" : results,
+        "oracle" : {"runs" : args.oracle_runs, "mismatches" : mismatches},
+    }
+    text = json.dumps(report, indent = 2)
+    if args.output is None :
+        print(text)
+    else :
+        with open(args.output, "w") as out:
+            out.write(text + "\n")
+    different = [r for r in results if r.get("identical") is False]
+    if mismatches or different :
+        exit("an engine printed different joins than the original implementation")
+
+if __name__ == "__main__":
+    main(sys.argv)
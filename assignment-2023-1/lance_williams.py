@@ -1,4 +1,21 @@
+import argparse
+import os
+import sys
 from sys import argv
+from io import StringIO
+from glob import glob
+from time import perf_counter
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from array import array
+from math import isqrt
+from numbers import Integral
+from heapq import heapify, heappop, heappush
+
+try :
+    import numpy as np
+except ImportError : # the pure python engines are used instead
+    np = None
 
 def addClusts(u, v) :
     ''' Input:  u,v, 2 lists representing 2 clusters to be joined 
@@ -24,108 +41,531 @@ def minIn(dist):
                 c2 = i    
     return minD,c1,c2
 
-def coefficients(method,node):
+def coefficients(method, ns, nt, nv):
     ''' Input:  method, the specified method used for clustering data
-                node, the node of the 'v' cluster in 'clusters'
-        Data:   fcluster, the 's' cluster
-                scluster, the 't' cluster
-                clusters, a list containing all clusters
-        Output: ai,aj,b,g, the coefficients needed to calculated the distance between 2 clusters '''    
+                ns, the size of the 's' cluster
+                nt, the size of the 't' cluster
+                nv, the size of the 'v' cluster
+        Output: ai,aj,b,g, the coefficients needed to calculated the distance between 2 clusters '''
     if method == "single" :
         return 0.5,0.5,0,-0.5 
     elif method == "complete" :
         return 0.5,0.5,0,0.5
     elif method == "average" :
-        ai = len(fcluster) / (len(fcluster) + len(scluster))
-        aj = len(scluster) / (len(fcluster) + len(scluster))
+        ai = ns / (ns + nt)
+        aj = nt / (ns + nt)
         return ai,aj,0,0
     else :
-        ai = (len(fcluster) + len(clusters[node])) / (len(fcluster) + len(clusters[node]) + len(scluster))
-        aj = (len(scluster) + len(clusters[node])) / (len(fcluster) + len(clusters[node]) + len(scluster))
-        b = - len(clusters[node]) / (len(fcluster) + len(clusters[node]) + len(scluster))
+        ai = (ns + nv) / (ns + nv + nt)
+        aj = (nt + nv) / (ns + nv + nt)
+        b = - nv / (ns + nv + nt)
         return ai,aj,b,0
 
-available = ["single", "complete", "average", "ward"] 
+def distanceMatrix(values):
+    ''' Input:  values, a sorted list of numbers
+        Output: dist, a lower triangular 2d matrix where dist[i][j] (j < i) is the distance
+                of values i & j and dist[i][i] is inf '''
+    dist = []
+    for i in range(len(values)):
+        col = []
+        for j in range(len(values)):
+            if i > j:
+                col.append(float(round(abs(values[i] - values[j]),2)))
+            elif i == j :
+                col.append(float('inf'))
+        dist.append(col) 
+    return dist
 
-method = argv[1]
-file = argv[2]
+def updateMatrix(dist, c1, c2, method, sizes):
+    ''' Input:  dist, a lower triangular 2d matrix of the distances between clusters
+                c1, c2, the indices of the 2 clusters to be joined (c1 < c2)
+                method, the specified method used for clustering data
+                sizes, a list where sizes[i] is the size of cluster i
+        Output: rows, the distance matrix after joining the 2 clusters in the position of c1 '''
+    rows = []
+    for i in range(len(dist)):
+        if i == c2: continue # skip the second cluster               
+        col = []
+        for j in range(len(dist[i])):
+            if j == c2: continue # skip the second cluster
+            if i == j:
+                col.append(float('inf'))
+            elif i == c1:
+                ai,aj,b,g = coefficients(method, sizes[c1], sizes[c2], sizes[j])
+                dsv = dist[c1][j]  # d(s,v)
+                dtv = dist[c2][j]  # d(t,v)
+                dst = dist[c2][c1] # d(s,t)
+                duv = ai * dsv + aj * dtv + b * dst + g * abs(dsv - dtv) # d(u,v)
+                col.append(float(round(duv,2)))
+            elif j == c1:
+                ai,aj,b,g = coefficients(method, sizes[c1], sizes[c2], sizes[i])
+                dsv = dist[i][c1]  # d(s,v)
+                if c2 >= len(dist[i]) : # check that the cluster we are iterating is in the range of c2 (its distance w c2 is calculated in row c2)
+                    dtv = dist[c2][i]  # d(t,v)
+                else :
+                    dtv = dist[i][c2]
+                dst = dist[c2][c1] # d(s,t)
+                duv = ai * dsv + aj * dtv + b * dst + g * abs(dsv - dtv) # d(u,v)
+                col.append(float(round(duv,2)))
+            else :
+                col.append(dist[i][j])         
+        rows.append(col)
+    return rows
 
-if method not in available :
-    exit("Not an acceptable method. Program termination")
-                                  
-try :
+def matrixMerges(values, method):
+    ''' Input:  values, a sorted list of numbers, each one being its own cluster
+                method, the specified method used for clustering data
+        Output: yields s,t,minD,size for every join, where s,t are the positions (in values) the 2 clusters
+                are kept in, minD their distance and size the length of the new cluster, which takes the position s.
+                The distance matrix is rebuilt after every join '''
+    dist = distanceMatrix(values)
+    slots = list(range(len(values))) # the position in values that each cluster is kept in
+    sizes = [1] * len(values)
+    while len(slots) > 1:
+        # get the minimum distance between two clusters & the indeces of said clusters
+        minD,c1,c2 = minIn(dist)
+        yield slots[c1], slots[c2], minD, sizes[c1] + sizes[c2]
+        dist = updateMatrix(dist, c1, c2, method, sizes)
+        # the new cluster takes the old position of the first one
+        sizes[c1] += sizes[c2]
+        sizes.pop(c2)
+        slots.pop(c2)
+
+def condensedIndex(i, j):
+    ''' Input:  i, j, the positions of 2 clusters, where j < i
+        Output: the index of d(i,j) in a condensed (flat, row by row lower triangular) distance array '''
+    return i * (i - 1) // 2 + j
+
+def condensedDistances(values):
+    ''' Input:  values, a sorted list of numbers
+        Output: dist, an array('d') holding the lower triangle of the distance matrix of values
+                row by row, where d(i,j) (j < i) is kept in dist[condensedIndex(i, j)] '''
+    dist = array('d')
+    for i in range(len(values)):
+        vi = values[i]
+        dist.extend(float(round(abs(vi - values[j]),2)) for j in range(i))
+    return dist
+
+def condensedMerges(values, method):
+    ''' Input:  values, a sorted list of numbers, each one being its own cluster
+                method, the specified method used for clustering data
+        Output: yields s,t,minD,size for every join, the same as matrixMerges
+                The distances are kept in a single condensed array that is updated in place: the row & column
+                of the new cluster are overwritten and the ones of the removed cluster are set to inf '''
+    inf = float('inf')
+    dist = condensedDistances(values)
+    sizes = [1] * len(values)
+    alive = list(range(len(values))) # the positions that still hold a cluster, in order
+    while len(alive) > 1:
+        minD = min(dist)
+        k = dist.index(minD) # first occurance of min, row by row
+        t = (1 + isqrt(8 * k + 1)) // 2 # row of k
+        s = k - condensedIndex(t, 0)    # column of k
+        ns,nt = sizes[s],sizes[t]
+        yield s, t, minD, ns + nt
+
+        # update distances
+        dst = dist[k] # d(s,t)
+        for v in alive:
+            if v == s or v == t: continue
+            sv = condensedIndex(s, v) if v < s else condensedIndex(v, s)
+            tv = condensedIndex(t, v) if v < t else condensedIndex(v, t)
+            ai,aj,b,g = coefficients(method, ns, nt, sizes[v])
+            dsv = dist[sv] # d(s,v)
+            dtv = dist[tv] # d(t,v)
+            duv = ai * dsv + aj * dtv + b * dst + g * abs(dsv - dtv) # d(u,v)
+            dist[sv] = float(round(duv,2))
+            dist[tv] = inf # mark the second cluster as removed
+        dist[k] = inf
+        sizes[s] = ns + nt
+        alive.remove(t)
+
+def rowMin(dist, i):
+    ''' Input:  dist, a condensed distance array
+                i, a row of dist
+        Output: m, the minimum element of row i (inf if the row is empty)
+                j, the column of the first occurance of m in row i (-1 if the row is empty) '''
+    if i == 0 : return float('inf'), -1
+    base = condensedIndex(i, 0)
+    row = dist[base:base + i]
+    m = min(row)
+    return m, row.index(m)
+
+def heapMerges(values, method):
+    ''' Input:  values, a sorted list of numbers, each one being its own cluster
+                method, the specified method used for clustering data
+        Output: yields s,t,minD,size for every join, the same as matrixMerges
+                The minimum of every row of the condensed distances is cached & kept in a heap of (min, row, column)
+                entries that are invalidated lazily, so only the rows whose minimum was changed by a join are scanned again '''
+    inf = float('inf')
+    n = len(values)
+    dist = condensedDistances(values)
+    sizes = [1] * n
+    alive = list(range(n)) # the positions that still hold a cluster, in order
+    minD = [inf] * n # minD[i], the minimum of row i
+    minJ = [-1] * n  # minJ[i], the column of the first occurance of minD[i] in row i
+    for i in range(1, n):
+        minD[i],minJ[i] = rowMin(dist, i)
+    heap = [(minD[i], i, minJ[i]) for i in range(1, n)]
+    heapify(heap)
+    while len(alive) > 1:
+        # (min, row, column) is ordered the same way minIn picks the first occurance of the min
+        d,t,s = heappop(heap)
+        if minJ[t] != s or minD[t] != d : continue # outdated entry, the row has changed since it was pushed
+        ns,nt = sizes[s],sizes[t]
+        yield s, t, d, ns + nt
+
+        # update distances & the minimums of the rows that hold the distance to the new cluster
+        k = condensedIndex(t, s)
+        for v in alive:
+            if v == s or v == t: continue
+            sv = condensedIndex(s, v) if v < s else condensedIndex(v, s)
+            tv = condensedIndex(t, v) if v < t else condensedIndex(v, t)
+            ai,aj,b,g = coefficients(method, ns, nt, sizes[v])
+            dsv = dist[sv] # d(s,v)
+            dtv = dist[tv] # d(t,v)
+            duv = float(round(ai * dsv + aj * dtv + b * d + g * abs(dsv - dtv),2)) # d(u,v)
+            dist[sv] = duv
+            dist[tv] = inf # mark the second cluster as removed
+            if v < s : continue # d(u,v) is in row s, it is scanned again below
+            if minJ[v] == t or (minJ[v] == s and duv > minD[v]) :
+                minD[v],minJ[v] = rowMin(dist, v)
+            elif duv < minD[v] or (duv == minD[v] and s <= minJ[v]) :
+                minD[v],minJ[v] = duv,s
+            else : continue
+            heappush(heap, (minD[v], v, minJ[v]))
+        dist[k] = inf
+        sizes[s] = ns + nt
+        alive.remove(t)
+        minD[t],minJ[t] = inf,-1
+        minD[s],minJ[s] = rowMin(dist, s)
+        heappush(heap, (minD[s], s, minJ[s]))
+
+        if len(heap) > 4 * len(alive) : # drop the outdated entries
+            heap = [(minD[i], i, minJ[i]) for i in alive if minJ[i] != -1]
+            heapify(heap)
+
+def lineMerges(values, method):
+    ''' Input:  values, a sorted list of numbers, each one being its own cluster
+                method, the specified method used for clustering data (only "single")
+        Output: yields s,t,minD,size for every join, the same as matrixMerges
+                For numbers on a line, single linkage only ever joins 2 neighboring clusters & their distance
+                is the gap between them, so the joins are the gaps between consecutive values in (gap, position) order '''
+    n = len(values)
+    first = list(range(n)) # first[e], the position the cluster ending in position e starts from
+    last = list(range(n))  # last[s], the position the cluster starting in position s ends in
+    gaps = [(float(round(abs(values[k] - values[k - 1]),2)), k) for k in range(1, n)]
+    gaps.sort()
+    for gap,k in gaps:
+        s = first[k - 1] # the cluster on the left of the gap
+        e = last[k]      # the end of the cluster on the right of the gap
+        yield s, k, gap, e - s + 1
+        last[s] = e
+        first[e] = s
+
+def numpyDistances(values):
+    ''' Input:  values, a sorted list of numbers
+        Output: dist, a numpy array holding the same condensed distances as condensedDistances(values),
+                where every row is computed at once, with 64 bit integers for integers & 64 bit floats otherwise '''
+    if not all(isinstance(v, Integral) for v in values) : # an int64 array would truncate the numbers
+        points = np.array(values, dtype = np.float64)
+        dist = np.empty(len(values) * (len(values) - 1) // 2)
+        for i in range(1, len(values)):
+            base = condensedIndex(i, 0)
+            dist[base:base + i] = numpyRound(np.abs(points[i] - points[:i])) # rounded like condensedDistances
+        return dist
+    try :
+        points = np.array(values, dtype = np.int64)
+    except OverflowError : # a number does not fit in 64 bits
+        return np.array(condensedDistances(values))
+    if len(values) > 1 and values[-1] - values[0] >= 1 << 63 : # a distance does not fit in 64 bits
+        return np.array(condensedDistances(values))
+    dist = np.empty(len(values) * (len(values) - 1) // 2)
+    for i in range(1, len(values)):
+        base = condensedIndex(i, 0)
+        dist[base:base + i] = np.abs(points[i] - points[:i]) # the distances of values i & 0..i-1
+    return dist
+
+def numpyRound(x):
+    ''' Input:  x, a numpy array
+        Output: r, x rounded to 2 decimals, the same as round(x, 2) for every element of x '''
+    r = np.round(x, 2)
+    y = x * 100
+    near = np.abs(y - np.floor(y) - 0.5) < np.maximum(1e-6, np.abs(y) * 1e-12)
+    for i in np.flatnonzero(near): # x * 100 is not exact, round the elements close to a tie the same way python does
+        r[i] = round(float(x[i]),2)
+    return r
+
+def numpyRowMin(dist, i):
+    ''' Input:  dist, a condensed distance numpy array
+                i, a row of dist
+        Output: m,j, the same as rowMin(dist, i) '''
+    if i == 0 : return float('inf'), -1
+    base = condensedIndex(i, 0)
+    j = int(dist[base:base + i].argmin()) # argmin returns the first occurance
+    return float(dist[base + j]), j
+
+def numpyMerges(values, method):
+    ''' Input:  values, a sorted list of numbers, each one being its own cluster
+                method, the specified method used for clustering data
+        Output: yields s,t,minD,size for every join, the same as heapMerges
+                The distances of the new cluster to every other cluster are updated with a single vector operation,
+                using an array of the cluster sizes '''
+    inf = float('inf')
+    n = len(values)
+    dist = numpyDistances(values)
+    sizes = np.ones(n, dtype = np.int64)
+    alive = np.ones(n, dtype = bool) # alive[i] is True if position i still holds a cluster
+    count = n
+    minD = np.full(n, inf) # minD[i], the minimum of row i
+    minJ = np.full(n, -1, dtype = np.int64) # minJ[i], the column of the first occurance of minD[i] in row i
+    for i in range(1, n):
+        minD[i],minJ[i] = numpyRowMin(dist, i)
+    heap = [(float(minD[i]), i, int(minJ[i])) for i in range(1, n)]
+    heapify(heap)
+    while count > 1:
+        d,t,s = heappop(heap)
+        if minJ[t] != s or minD[t] != d : continue # outdated entry, the row has changed since it was pushed
+        ns,nt = int(sizes[s]),int(sizes[t])
+        yield s, t, d, ns + nt
+
+        # update distances of every other cluster v at once
+        alive[t] = alive[s] = False
+        v = np.flatnonzero(alive)
+        alive[s] = True
+        sv = np.where(v < s, s * (s - 1) // 2 + v, v * (v - 1) // 2 + s)
+        tv = np.where(v < t, t * (t - 1) // 2 + v, v * (v - 1) // 2 + t)
+        ai,aj,b,g = coefficients(method, ns, nt, sizes[v])
+        dsv = dist[sv] # d(s,v)
+        dtv = dist[tv] # d(t,v)
+        duv = numpyRound(ai * dsv + aj * dtv + b * d + g * np.abs(dsv - dtv)) # d(u,v)
+        dist[sv] = duv
+        dist[tv] = inf # mark the second cluster as removed
+        dist[condensedIndex(t, s)] = inf
+        sizes[s] = ns + nt
+        count -= 1
+        minD[t],minJ[t] = inf,-1
+
+        # update the minimums of the rows after s, that hold d(u,v)
+        after = v > s
+        rows = v[after]
+        duv = duv[after]
+        arg = minJ[rows]
+        cur = minD[rows]
+        rescan = (arg == t) | ((arg == s) & (duv > cur))
+        better = ~rescan & ((duv < cur) | ((duv == cur) & (s <= arg)))
+        minD[rows[better]] = duv[better]
+        minJ[rows[better]] = s
+        for r in rows[rescan]:
+            minD[r],minJ[r] = numpyRowMin(dist, r)
+        for r in rows[better | rescan].tolist():
+            heappush(heap, (float(minD[r]), r, int(minJ[r])))
+        minD[s],minJ[s] = numpyRowMin(dist, s)
+        heappush(heap, (float(minD[s]), s, int(minJ[s])))
+
+        if len(heap) > 4 * count : # drop the outdated entries
+            heap = [(float(minD[i]), i, int(minJ[i])) for i in np.flatnonzero(minJ != -1).tolist()]
+            heapify(heap)
+
+engines = {"matrix" : matrixMerges, "condensed" : condensedMerges, "heap" : heapMerges, "line" : lineMerges}
+if np is not None :
+    engines["numpy"] = numpyMerges
+
+def readNumbers(numbers, size = 1 << 20):
+    ''' Input:  numbers, an open text file
+                size, the number of characters read at a time
+        Output: values, an array('q') (or a list, if some number does not fit in 64 bits) of the whitespace
+                separated integers in the first line of numbers, which is read in chunks of size characters '''
+    values = array('q')
+    rest = '' # a number that was cut at the end of the previous chunk
+    while True:
+        chunk = numbers.read(size)
+        end = chunk.find('\n')
+        done = end != -1 or not chunk
+        if end != -1 :
+            chunk = chunk[:end] # only the first line holds numbers
+        chunk = rest + chunk
+        tokens = chunk.split()
+        rest = ''
+        if not done and tokens and not chunk[-1].isspace() :
+            rest = tokens.pop()
+        ints = [int(x) for x in tokens]
+        try :
+            values += array('q', ints) if isinstance(values, array) else ints
+        except OverflowError : # a number does not fit in 64 bits, keep python ints
+            values = list(values) + ints
+        if done : return values
+
+def members(nxt, s):
+    ''' Input:  nxt, an array where nxt[i] is the position after i in the cluster of i, or -1
+                s, the position a cluster is kept in
+        Output: m, the sorted positions of the elements of said cluster '''
+    m = []
+    while s != -1 :
+        m.append(s)
+        s = nxt[s]
+    m.sort()
+    return m
+
+def sortedValues(points):
+    ''' Input:  points, a list or an array of numbers
+        Output: the numbers of points sorted, in an array of the same type if points is an array '''
+    return array(points.typecode, sorted(points)) if isinstance(points, array) else sorted(points)
+
+def defaultEngine(method):
+    ''' Input:  method, the specified method used for clustering data
+        Output: the name of the engine used for method, if none is specified '''
+    # single linkage of numbers is solved on the line, every other method uses numpy if it is installed
+    if method == "single" : return "line"
+    return "numpy" if np is not None else "heap"
+
+def cluster(points, method, engine = None):
+    ''' Input:  points, a list or an array of numbers, in any order
+                method, the specified method used for clustering data
+                engine, the name of the engine (in engines) used for the clustering, or None for defaultEngine(method)
+        Output: linkage, a list with a (left, right, distance, size) tuple for every join, where left & right are the ids
+                of the 2 joined clusters and size the length of the new one. Ids 0..n-1 are the points in sorted order
+                and the cluster created by the k-th join gets the id n+k '''
+    if method not in available :
+        raise ValueError("Not an acceptable method")
+    if engine is None :
+        engine = defaultEngine(method)
+    if engine not in engines or (engine == "line" and method != "single") :
+        raise ValueError("Not an acceptable engine")
+    values = sortedValues(points)
+    n = len(values)
+    ids = list(range(n)) # ids[i], the id of the cluster kept in position i
+    linkage = []
+    for s,t,minD,size in engines[engine](values, method):
+        linkage.append((ids[s], ids[t], minD, size))
+        ids[s] = n + len(linkage) - 1 # the new cluster takes the old position of the first one
+    return linkage
+
+def writeLinkage(points, linkage, out = None):
+    ''' Input:  points, the numbers that were clustered, in any order
+                linkage, the joins of said numbers, as returned by cluster
+                out, a text file, sys.stdout if None
+        Result: every join is rendered as "(cluster 1) (cluster 2) distance  size" and the whole text is written
+                in out with a single write '''
+    values = sortedValues(points)
+    n = len(values)
+    nxt = array('q', [-1]) * n # nxt[i], the position after i in the cluster of i, or -1
+    head = array('q', range(n)) + array('q', [0]) * len(linkage) # head[c], the first position of cluster c
+    tail = array('q', range(n)) + array('q', [0]) * len(linkage) # tail[c], the last position of cluster c
+    lines = []
+    for k,(left,right,minD,size) in enumerate(linkage):
+        fcluster = " ".join([str(values[i]) for i in members(nxt, head[left])])  # cluster 1
+        scluster = " ".join([str(values[i]) for i in members(nxt, head[right])]) # cluster 2
+        lines.append("(" + fcluster + ") (" + scluster + ") " + str(minD) + "  " + str(size) + "\n")
+        nxt[tail[left]] = head[right]
+        head[n + k] = head[left]
+        tail[n + k] = tail[right]
+    (sys.stdout if out is None else out).write("".join(lines))
+
+def clusterFile(file, method, engine = None, outdir = None, base = None):
+    ''' Input:  file, a file with numbers
+                method, the specified method used for clustering data
+                engine, the name of the engine used for the clustering, or None for defaultEngine(method)
+                outdir, a directory to write the joins in (as <path of file from base>.out), or None
+                base, the directory the names in outdir are relative to, or None for the directory of file
+        Output: file, count, text, where count is the amount of numbers in file and text the rendered joins
+                (None if they were written in outdir) '''
     with open(file) as numbers:
-        content = numbers.readline() # take as input the numbers from file
-        clusters = content.split(" ") # place each number in a seperate node of the list 'clusters'
-        clusters = [[int(x)] for x in clusters] # typecast the list to int & make each element its own cluster
-        clusters.sort()
-
-        # find the starting distances
-        dist = []
-        for i in range(len(clusters)):
-            col = []
-            for j in range(len(clusters)):
-                if i > j:
-                    col.append(float(round(abs(clusters[i][0] - clusters[j][0]),2)))
-                elif i == j :
-                    col.append(float('inf'))
-            dist.append(col) 
-
-        while len(clusters) > 1:
-            
-            # get the minimum distance between two clusters & the indeces of said clusters
-            minD,c1,c2 = minIn(dist)
-
-            fcluster = clusters[c1] # cluster 1
-            scluster = clusters[c2] # cluster 2
-            newC = addClusts(fcluster,scluster) # the new cluster
-
-            # print the 2 clusters to be joined
-            print("(", end = "")
-            print(*fcluster, end ="")
-            print(")",end = " ")
-            print("(",end = "")
-            print(*scluster, end ="")
-            print(")",end = " ")
-
-            print(minD, end = "  ") # dist of clusters that are being conjoined
-            print(len(newC)) # length of new cluster
-
-            # update distances
-            rows = []
-            for i in range(len(dist)):
-                if i == c2: continue # skip the second cluster               
-                col = []
-                for j in range(len(dist[i])):
-                    if j == c2: continue # skip the second cluster
-                    if i == j:
-                        col.append(float('inf'))
-                    elif i == c1:
-                        ai,aj,b,g = coefficients(method, j)
-                        dsv = dist[c1][j]  # d(s,v)
-                        dtv = dist[c2][j]  # d(t,v)
-                        dst = dist[c2][c1] # d(s,t)
-                        duv = ai * dsv + aj * dtv + b * dst + g * abs(dsv - dtv) # d(u,v)
-                        col.append(float(round(duv,2)))
-                    elif j == c1:
-                        ai,aj,b,g = coefficients(method, i)
-                        dsv = dist[i][c1]  # d(s,v)
-                        if c2 >= len(dist[i]) : # check that the cluster we are iterating is in the range of c2 (its distance w c2 is calculated in row c2)
-                            dtv = dist[c2][i]  # d(t,v)
-                        else :
-                            dtv = dist[i][c2]
-                        dst = dist[c2][c1] # d(s,t)
-                        duv = ai * dsv + aj * dtv + b * dst + g * abs(dsv - dtv) # d(u,v)
-                        col.append(float(round(duv,2)))
-                    else :
-                        col.append(dist[i][j])         
-                rows.append(col)
-            dist = rows
-            
-            # remove the 2 clusters
-            clusters.remove(fcluster)
-            clusters.remove(scluster)
-            # add the new cluster in the old position of the first one
-            clusters.insert(c1,newC)
-except FileNotFoundError:
-    print("404: File not Found")
+        values = readNumbers(numbers)
+    linkage = cluster(values, method, engine)
+    if outdir is None :
+        text = StringIO()
+        writeLinkage(values, linkage, text)
+        return file, len(values), text.getvalue()
+    name = os.path.join(outdir, os.path.relpath(file, os.path.dirname(file) if base is None else base) + ".out")
+    os.makedirs(os.path.dirname(name), exist_ok = True) # the files of subdirectories keep their subdirectories
+    with open(name, "w") as out:
+        writeLinkage(values, linkage, out)
+    return file, len(values), None
+
+def batchFile(file, method, engine, outdir, base):
+    ''' Input:  file, method, engine, outdir, base, like clusterFile
+        Output: file, count, text, error, like clusterFile, where error is the message of the error that stopped
+                the clustering of file (count = 0 & text = None then), or None '''
+    try :
+        return clusterFile(file, method, engine, outdir, base) + (None,)
+    except (OSError, ValueError) as e : # an unreadable file or a token that is not a number
+        return file, 0, None, str(e)
+
+def batchFiles(path):
+    ''' Input:  path, a directory or a glob pattern
+        Output: the sorted list of the files in said directory, or of the files that match said pattern '''
+    if os.path.isdir(path) :
+        path = os.path.join(path, "*")
+    return sorted(f for f in glob(path) if os.path.isfile(f))
+
+def batch(path, method, engine = None, outdir = None, workers = None):
+    ''' Input:  path, a directory or a glob pattern of files with numbers
+                method, the specified method used for clustering data
+                engine, the name of the engine used for the clustering, or None for defaultEngine(method)
+                outdir, a directory to write the joins of every file in, or None to print them
+                workers, the number of processes used, or None for one per cpu
+        Result: every file is clustered in a process pool. The joins are written in outdir, under the path of every
+                file from the directory that holds all of them, or printed in the order of the files, each one after a
+                "==> file <==" line. A file that can not be clustered is reported in stderr & skipped. The throughput
+                is printed in stderr '''
+    files = batchFiles(path)
+    base = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files]) if files else None
+    if outdir is not None :
+        os.makedirs(outdir, exist_ok = True)
+    workers = workers or os.cpu_count() or 1
+    count = 0
+    failed = 0
+    begin = perf_counter()
+    with ProcessPoolExecutor(workers) as pool:
+        chunk = max(1, len(files) // (4 * workers)) # send the small files to the workers in groups
+        results = pool.map(batchFile, files, repeat(method), repeat(engine), repeat(outdir), repeat(base), chunksize = chunk)
+        for file,n,text,error in results: # map returns the results in the order of files
+            count += n
+            if error is not None :
+                failed += 1
+                print("error:", file + ":", error, file = sys.stderr)
+            elif text is not None :
+                sys.stdout.write("==> " + file + " <==\n" + text)
+    elapsed = perf_counter() - begin
+    print(len(files), "files,", count, "numbers in", round(elapsed,2), "s,",
+          round(len(files) / elapsed, 1) if elapsed else 0, "files/s,",
+          round(count / elapsed) if elapsed else 0, "numbers/s", file = sys.stderr)
+    if failed :
+        print(failed, "files could not be clustered", file = sys.stderr)
+
+available = ["single", "complete", "average", "ward"] 
+
+def main(args):
+    ''' Input:  args, the command line arguments
+        Result: the joins of the numbers in file (or in every file with --batch) are printed '''
+    # add switches to allow user choices of execution in cli
+    parser = argparse.ArgumentParser()
+    parser.add_argument('method', help = 'one of ' + ", ".join(available))
+    parser.add_argument('file', help = 'the file with the numbers, or a directory / glob pattern of files with --batch')
+    parser.add_argument('engine', nargs = '?', help = 'one of ' + ", ".join(engines))
+    parser.add_argument('--batch', action = 'store_true', help = 'cluster every file of a directory / glob pattern in parallel')
+    parser.add_argument('-o', dest = 'outdir', help = 'with --batch, write the joins of every file in this directory')
+    parser.add_argument('-j', dest = 'workers', type = int, help = 'with --batch, the number of processes used')
+    args = parser.parse_args(args[1:])
+    method = args.method
+    engine = args.engine
+
+    if method not in available :
+        exit("Not an acceptable method. Program termination")
+    if engine is not None and (engine not in engines or (engine == "line" and method != "single")) :
+        exit("Not an acceptable engine. Program termination")
+
+    if args.batch :
+        batch(args.file, method, engine, args.outdir, args.workers)
+        return
+    try :
+        with open(args.file) as numbers:
+            values = readNumbers(numbers) # take as input the numbers from file
+    except FileNotFoundError:
+        print("404: File not Found")
+        return
+    writeLinkage(values, cluster(values, method, engine))
+
+if __name__ == "__main__":
+    main(argv)
@@ -0,0 +1,218 @@
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import tracemalloc
+from io import StringIO
+from time import perf_counter
+
+import interval_graphs as ig
+
+def relabel(edges, rng):
+    ''' Input:  edges, a list of [k, j] edges
+                rng, a random.Random
+        Output: nodes, edges, where the nodes of edges are renamed to 0..n-1 at random, the edges are shuffled
+                and nodes holds the nodes in order of first appearance, like the original script reads them '''
+    names = sorted({i for e in edges for i in e})
+    new = list(range(len(names)))
+    rng.shuffle(new)
+    label = dict(zip(names, new))
+    edges = [[label[k], label[j]] if rng.random() < 0.5 else [label[j], label[k]] for k,j in edges]
+    rng.shuffle(edges)
+    nodes = []
+    seen = set()
+    for e in edges:
+        for i in e:
+            if i not in seen :
+                seen.add(i)
+                nodes.append(i)
+    return nodes, edges
+
+def intervalGraph(n, rng):
+    ''' Input:  n, the amount of nodes
+                rng, a random.Random
+        Output: the edges between n random intervals that intersect, an interval graph '''
+    intervals = sorted((a, a + rng.randint(0, 10)) for a in (rng.randint(0, 2 * n) for i in range(n)))
+    edges = []
+    for u in range(n):
+        v = u + 1
+        while v < n and intervals[v][0] <= intervals[u][1]:
+            edges.append([u, v])
+            v += 1
+    return edges
+
+def chordalGraph(n, rng):
+    ''' Input:  n, the amount of nodes
+                rng, a random.Random
+        Output: the edges between n random subtrees of a random tree that intersect, a chordal graph '''
+    size = max(2, n // 2)
+    parent = [None] + [rng.randrange(max(0, i - 5), i) for i in range(1, size)]
+    children = [[] for i in range(size)]
+    for i in range(1, size):
+        children[parent[i]].append(i)
+    owners = [[] for i in range(size)] # the subtrees that hold every node of the tree
+    for u in range(n):
+        root = rng.randrange(size)
+        subtree = [root]
+        for i in range(rng.randint(0, 3)): # grow the subtree by a few children
+            options = [c for t in subtree for c in children[t] if c not in subtree]
+            if not options : break
+            subtree.append(rng.choice(options))
+        for t in subtree:
+            owners[t].append(u)
+    edges = set()
+    for nodes in owners:
+        for a in range(len(nodes)):
+            for b in range(a + 1, len(nodes)):
+                edges.add((nodes[a], nodes[b]))
+    return [list(e) for e in sorted(edges)]
+
+def gnpGraph(n, rng):
+    ''' Input:  n, the amount of nodes
+                rng, a random.Random
+        Output: the edges of a G(n, p) random graph with about 4 neighbors per node, which is not chordal
+                in all but the smallest cases '''
+    p = min(1, 4 / max(1, n - 1))
+    return [[u, v] for u in range(n) for v in range(u + 1, n) if rng.random() < p]
+
+def fanGraph(n, rng):
+    ''' Input:  n, the amount of nodes
+                rng, a random.Random
+        Output: the edges of a fan, a path of n - 1 nodes & a hub connected to all of them, an interval graph
+                where the hub is in every maximal clique '''
+    return [[i, i + 1] for i in range(1, n - 1)] + [[0, i] for i in range(1, n)]
+
+generators = {
+    "interval" : intervalGraph,
+    "fan" : fanGraph,
+    "chordal" : chordalGraph,
+    "gnp" : gnpGraph,
+}
+
+def prepare(nodes, edges):
+    ''' Input:  nodes, edges, a graph as the original script reads it
+        Output: adjList, csr, the Adjacency List & the CSRGraph of said graph '''
+    text = "\n".join(str(k) + " " + str(j) for k,j in edges)
+    return ig.createAdjList(nodes, edges), ig.loadGraph(StringIO(text))
+
+# the timed functions, name : (function of nodes, edges, adjList, csr, whether it is one of the original functions)
+functions = {
+    "createAdjList" : (lambda nodes, edges, adjList, csr : ig.createAdjList(nodes, edges), True),
+    "LexBFSseq" : (lambda nodes, edges, adjList, csr : ig.LexBFSseq(nodes, adjList), True),
+    "isChordal" : (lambda nodes, edges, adjList, csr : ig.isChordal(ig.LexBFSseq(nodes, adjList), adjList), True),
+    "isInterval" : (lambda nodes, edges, adjList, csr : ig.isInterval(ig.LexBFSseq(nodes, adjList), adjList), True),
+    "loadGraph" : (lambda nodes, edges, adjList, csr :
+                   ig.loadGraph(StringIO("\n".join(str(k) + " " + str(j) for k,j in edges))), False),
+    "LexBFS" : (lambda nodes, edges, adjList, csr : ig.LexBFS(csr.nodes, csr), False),
+    "checkPEO" : (lambda nodes, edges, adjList, csr : ig.checkPEO(ig.LexBFS(csr.nodes, csr), csr), False),
+    "intervalModel" : (lambda nodes, edges, adjList, csr : ig.intervalModel(ig.LexBFS(csr.nodes, csr), csr), False),
+}
+
+def measure(name, nodes, edges, adjList, csr):
+    ''' Input:  name, the name of a timed function
+                nodes, edges, adjList, csr, a graph
+        Output: a dictionary with the seconds spent by said function & its peak memory in bytes '''
+    function = functions[name][0]
+    begin = perf_counter()
+    function(nodes, edges, adjList, csr)
+    total = perf_counter() - begin
+    tracemalloc.start() # measured in a second run, tracing slows the functions down
+    function(nodes, edges, adjList, csr)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"total_s" : total, "peak_bytes" : peak}
+
+def exponent(points):
+    ''' Input:  points, a list of (n, seconds)
+        Output: the slope of the least squares line of log(seconds) over log(n), so that the seconds grow
+                like n ** slope, or None if there are less than two points '''
+    points = [(math.log(n), math.log(s)) for n,s in points if n > 0 and s > 0]
+    if len(points) < 2 :
+        return None
+    mx = sum(x for x,y in points) / len(points)
+    my = sum(y for x,y in points) / len(points)
+    sxx = sum((x - mx) ** 2 for x,y in points)
+    if sxx == 0 :
+        return None
+    return sum((x - mx) * (y - my) for x,y in points) / sxx
+
+def oracle(runs, rng):
+    ''' Input:  runs, the amount of small random graphs of every generator
+                rng, a random.Random
+        Output: mismatches, a list with the (generator, check, edges) for which a new engine gave a different
+                answer than the original functions '''
+    mismatches = []
+    for run in range(runs):
+        for kind, generator in generators.items():
+            nodes, edges = relabel(generator(rng.randint(2, 9), rng), rng)
+            if not edges : continue
+            adjList, csr = prepare(nodes, edges)
+            LexBFSList = ig.LexBFS(csr.nodes, csr)
+            labels = [csr.labels[node] for node in LexBFSList]
+            checks = {
+                # every LexBFS sequence is a perfect elimination ordering of a chordal graph, reversed
+                "LexBFS" : ig.isChordal(labels, adjList) == ig.isChordal(ig.LexBFSseq(nodes, adjList), adjList),
+                "loadGraph" : labels == ig.LexBFS(nodes, adjList),
+                "checkPEO" : ig.checkPEO(LexBFSList, csr)[0] == ig.isChordal(labels, adjList),
+                "intervalModel" : (ig.intervalModel(LexBFSList, csr) is not None) == ig.isInterval(labels, adjList),
+            }
+            for check, same in checks.items():
+                if not same :
+                    mismatches.append({"generator" : kind, "check" : check, "edges" : edges})
+    return mismatches
+
+def main(args):
+    ''' Input:  args, the command line arguments
+        Result: every function is timed on random graphs of every size & generator, the new engines are checked
+                against the original functions, and the results are printed as json '''
+    parser = argparse.ArgumentParser(description = 'benchmark the functions of interval_graphs.py')
+    parser.add_argument('--sizes', type = int, nargs = '+', default = [50, 100, 200, 400, 800], help = 'the amounts of nodes')
+    parser.add_argument('--generators', nargs = '+', default = list(generators), choices = list(generators))
+    parser.add_argument('--functions', nargs = '+', default = list(functions), choices = list(functions))
+    parser.add_argument('--reference-max', type = int, default = 100,
+                        help = 'the largest size the original functions are run for (isInterval is cubic or worse)')
+    parser.add_argument('--oracle-runs', type = int, default = 100, help = 'the amount of small random graphs every engine is checked on')
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('-o', dest = 'output', help = 'write the json in this file instead of stdout')
+    args = parser.parse_args(args[1:])
+    rng = random.Random(args.seed)
+
+    results = []
+    for n in args.sizes:
+        for kind in args.generators:
+            nodes, edges = relabel(generators[kind](n, rng), rng)
+            adjList, csr = prepare(nodes, edges)
+            for name in args.functions:
+                if functions[name][1] and n > args.reference_max : continue
+                result = measure(name, nodes, edges, adjList, csr)
+                result.update({"generator" : kind, "function" : name, "n" : len(nodes), "m" : len(edges)})
+                results.append(result)
+                print(kind, len(nodes), name, round(result["total_s"],3), "s", file = sys.stderr)
+
+    scaling = []
+    for kind in args.generators:
+        for name in args.functions:
+            points = [(r["n"] + r["m"], r["total_s"]) for r in results if r["generator"] == kind and r["function"] == name]
+            scaling.append({"generator" : kind, "function" : name, "exponent" : exponent(points)})
+
+    mismatches = oracle(args.oracle_runs, rng)
+    report = {
+        "python" : platform.python_version(),
+        "numpy" : None if ig.np is None else ig.np.__version__,
+        "results" : results,
+        "scaling" : scaling, # the seconds grow like (n + m) ** exponent
+        "oracle" : {"runs" : args.oracle_runs, "mismatches" : mismatches},
+    }
+    text = json.dumps(report, indent = 2)
+    if args.output is None :
+        print(text)
+    else :
+        with open(args.output, "w") as out:
+            out.write(text + "\n")
+    if mismatches :
+        exit("an engine gave a different answer than the original functions")
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -1,14 +1,20 @@
+import argparse
+import json
+import os
+import sys
 from sys import argv
 from collections import deque
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 
-task = argv[1]
-file = argv[2]
+try :
+    import numpy as np
+except ImportError : # the loader falls back to pure python
+    np = None
 
 available = ['lexbfs', 'chordal', 'interval']
 
-if task not in available :
-    exit("Not an acceptable task. Program termination")
-
 def createAdjList(nodes, edges) :
     ''' Input:  nodes, a list containing the nodes of a graph
                 edges, a list containing the edges of a graph
@@ -51,6 +57,84 @@ def LexBFSseq(nodes, adjList) :
         S = S2
     return LexBFSList
 
+def LexBFS(nodes, adjList) :
+    ''' Input:  nodes, a list containing the nodes of a graph
+                adjList, the Adjacency List of the graph
+        Output: LexBFSList, the sequence that we would follow to traverse the graph using
+                the Lexicographical Breadth-First Search, computed by partition refinement in O(n + m).
+                Ties are broken by the order of the nodes in nodes for the starting class only: the neighbors
+                of a visited node that are split off of a class keep the order of adjList[node], and the rest of
+                the class keeps its order. So the sequence is a LexBFS, but not the one of LexBFSseq, which
+                takes the nodes of a class in the order of set.pop '''
+    # the unvisited nodes are kept in a doubly linked list (prv, nxt), split in consecutive classes
+    # of nodes with the same label, where class c starts at first[c] & ends at last[c]
+    prv = {}
+    nxt = {}
+    previous = None
+    for node in nodes :
+        prv[node] = previous
+        nxt[node] = None
+        if previous is not None :
+            nxt[previous] = node
+        previous = node
+    head = nodes[0] if len(nodes) > 0 else None
+    cls = {node : 0 for node in nodes} # the class of each node
+    first = [head]
+    last = [previous]
+    split = [None] # split[c], the class that was split off of c by the current node
+    visited = {node : False for node in nodes}
+    moved = {node : None for node in nodes} # the last node that moved each node to a new class
+    LexBFSList = []
+    while head is not None :
+        node = head # the first node of the first class
+        c = cls[node]
+        if last[c] == node :
+            first[c] = last[c] = None
+        else :
+            first[c] = nxt[node]
+        head = nxt[node]
+        if head is not None :
+            prv[head] = None
+        visited[node] = True
+        LexBFSList.append(node)
+        touched = []
+        for n in adjList[node] :
+            if visited[n] or moved[n] == node : continue # dont check the neighbors that we have already visited
+            moved[n] = node
+            c = cls[n]
+            if split[c] is None : # the neighbors in c form a new class, right before c
+                split[c] = len(first)
+                first.append(None)
+                last.append(None)
+                split.append(None)
+                touched.append(c)
+            nc = split[c]
+            if first[c] == n : # n is already right before the rest of c
+                first[c] = nxt[n] if last[c] != n else None
+                if first[c] is None :
+                    last[c] = None
+            else : # move n right before the first node of c
+                if last[c] == n :
+                    last[c] = prv[n]
+                nxt[prv[n]] = nxt[n]
+                if nxt[n] is not None :
+                    prv[nxt[n]] = prv[n]
+                f = first[c]
+                prv[n] = prv[f]
+                nxt[n] = f
+                if prv[f] is not None :
+                    nxt[prv[f]] = n
+                else :
+                    head = n
+                prv[f] = n
+            if first[nc] is None :
+                first[nc] = n
+            last[nc] = n
+            cls[n] = nc
+        for c in touched :
+            split[c] = None
+    return LexBFSList
+
 def isChordal(LexBFSList, adjList) :
     ''' Input:  LexBFSList, the Lexicographical BFS ordering of a graph
                 adjList, the Adjacency List of said graph
@@ -72,12 +156,66 @@ def isChordal(LexBFSList, adjList) :
                     return False
     return True
 
+def checkPEO(LexBFSList, adjList) :
+    ''' Input:  LexBFSList, the Lexicographical BFS ordering of a graph
+                adjList, the Adjacency List of said graph
+        Output: True, peo if the given graph is chordal, where peo is the reversed LexBFSList,
+                a perfect elimination ordering of the graph
+                False, cert otherwise, where cert is a chordless cycle [v, u, ..., w] of length > 3,
+                or a (v, u, w) triple, where u,w are not connected and both are neighbors of v
+                that come after it in the reversed LexBFSList, u being the first of them '''
+    peo = LexBFSList[::-1]
+    pos = {node : i for i, node in enumerate(peo)} # the position of each node, computed once
+    test = {node : [] for node in peo} # test[u], (v,w) pairs where w has to be a neighbor of u
+    for v in peo :
+        u = None # the parent of v, its first neighbor after it
+        for n in adjList[v] :
+            if pos[n] > pos[v] and (u is None or pos[n] < pos[u]) :
+                u = n
+        if u is None : continue
+        for n in adjList[v] :
+            if pos[n] > pos[v] and n != u :
+                test[u].append((v, n)) # the right neighbors of v must be neighbors of u
+    mark = {node : None for node in peo}
+    for u in peo :
+        for n in adjList[u] :
+            mark[n] = u
+        for v,w in test[u] :
+            if mark[w] != u :
+                return False, chordlessCycle((v, u, w), adjList, pos)
+    return True, peo
+
+def chordlessCycle(triple, adjList, pos) :
+    ''' Input:  triple, a (v, u, w) triple as found by checkPEO
+                adjList, the Adjacency List of a graph
+                pos, the position of each node in the checked ordering
+        Output: a chordless cycle [v, u, ..., w] through the triple, made of u, w & the nodes after v
+                that are not neighbors of v, or triple if there is no such cycle '''
+    v,u,w = triple
+    nbs = set(adjList[v])
+    parent = {u : None}
+    queue = deque([u])
+    while len(queue) > 0 : # the shortest path from u to w has no chords
+        node = queue.popleft()
+        if node == w :
+            path = []
+            while node is not None :
+                path.append(node)
+                node = parent[node]
+            return [v] + path[::-1]
+        for n in adjList[node] :
+            if n in parent or pos[n] <= pos[v] : continue
+            if n in nbs and n != w : continue
+            parent[n] = node
+            queue.append(n)
+    return triple
+
 def splitComponents(adjList) :
     ''' Input:  adjList, The Adjacency List of a graph
         Output: components, a list where components[i] holds the
                 components that are left after removing node i
                 and its neighbors from the graph '''
-    components = [[] for c in nodes]
+    components = [[] for c in adjList]
     for i in adjList :
         newAdjList = {key : adjList[key][:] for key in adjList}
         newAdjList.pop(i) # remove the node
@@ -116,6 +254,7 @@ def splitComponents(adjList) :
 def isATFree(adjList) :
     ''' Input:  adjList, the Adjacency List of a graph
         Output: True if the given graph is free of Asteroidal Triples '''
+    nodes = list(adjList) # the nodes, in the order they were read
     components = splitComponents(adjList)
     C = []
     for i in nodes :
@@ -146,31 +285,547 @@ def isInterval(LexBFSList,adjList) :
         Output: True if the given graph is Interval '''   
     return isATFree(adjList) and isChordal(LexBFSList,adjList)
 
-# ---MAIN THREAD---
+def maximalCliques(peo, adjList) :
+    ''' Input:  peo, a perfect elimination ordering of a chordal graph
+                adjList, the Adjacency List of said graph
+        Output: cliques, a list with the maximal cliques of the graph, where each clique is a node v
+                together with its neighbors after it in peo '''
+    pos = {node : i for i, node in enumerate(peo)}
+    rnbs = {v : {n for n in adjList[v] if pos[n] > pos[v]} for v in peo} # the right neighbors of each node
+    covered = {v : False for v in peo}
+    for v in peo :
+        if len(rnbs[v]) == 0 : continue
+        u = min(rnbs[v], key = pos.__getitem__) # the parent of v
+        if len(rnbs[v]) == len(rnbs[u]) + 1 : # v & its right neighbors contain u & its right neighbors
+            covered[u] = True
+    return [[v] + list(rnbs[v]) for v in peo if not covered[v]]
 
-# construct the graph
-try :
+def intervalModel(LexBFSList, adjList, checked = None) :
+    ''' Input:  LexBFSList, the Lexicographical BFS ordering of a graph
+                adjList, the Adjacency List of a graph
+                checked, the result of checkPEO(LexBFSList, adjList) if it is known already, or None
+        Output: model, a dictionary where model[node] = (l, r) is an interval of node, so that 2 nodes are
+                connected if their intervals intersect, or None if the given graph is not Interval
+                The maximal cliques of a chordal graph are ordered by refining an ordered partition of them
+                until the cliques of every node are consecutive (a clique path) '''
+    chordal,peo = checkPEO(LexBFSList, adjList) if checked is None else checked
+    if not chordal : return None
+    cliques = maximalCliques(peo, adjList)
+    K = {node : [] for node in peo} # K[node], the cliques that contain node
+    for c,clique in enumerate(cliques) :
+        for node in clique :
+            K[node].append(c)
+
+    # the ordered partition of the cliques, a doubly linked list of classes
+    members = [set(range(len(cliques)))]
+    cprev = [None]
+    cnext = [None]
+    cls = [0] * len(cliques) # the class of each clique
+    head = [0] # the first class
+    pending = [0] # classes that may have more than 1 clique
+    queue = deque() # the nodes to refine the partition with
+    inQueue = {node : False for node in peo}
+    where = {node : {0 : len(K[node])} for node in peo} # where[node][X], the amount of cliques of node in class X
+    settled = {node : False for node in peo} # whether the cliques of node fill consecutive classes
+
+    def split(X, part, before) :
+        # move the cliques of part from class X to a new class right before or after X, and return the class
+        # that keeps the rest of X. The smaller side moves, so that every clique moves O(log n) times
+        if 2 * len(part) > len(members[X]) :
+            part,before = members[X] - part,not before
+            rest = len(members)
+        else :
+            rest = X
+        Y = len(members)
+        members.append(part)
+        members[X] -= part
+        if before :
+            cprev.append(cprev[X])
+            cnext.append(X)
+            if cprev[X] is None :
+                head[0] = Y
+            else :
+                cnext[cprev[X]] = Y
+            cprev[X] = Y
+        else :
+            cprev.append(X)
+            cnext.append(cnext[X])
+            if cnext[X] is not None :
+                cprev[cnext[X]] = Y
+            cnext[X] = Y
+        pending.extend((X, Y))
+        for c in part : # the nodes that may now be in cliques of both classes
+            cls[c] = Y
+            for node in cliques[c] :
+                if settled[node] : continue
+                counts = where[node]
+                counts[X] -= 1
+                if counts[X] == 0 :
+                    del counts[X]
+                counts[Y] = counts.get(Y, 0) + 1
+                if len(counts) > 1 and not inQueue[node] :
+                    inQueue[node] = True
+                    queue.append(node)
+        return rest
+
+    def refine(node) :
+        # the cliques of node must be consecutive: the classes between the first & the last class that
+        # contain them must be full, and the cliques go to the right end of the first & the left end of the last.
+        # Then they fill consecutive classes, which later splits keep, so node is settled & never refined again
+        touched = where[node]
+        if len(touched) < 2 : return True
+        lefts = [X for X in touched if cprev[X] not in touched]
+        rights = [X for X in touched if cnext[X] not in touched]
+        if len(lefts) != 1 : return False # the classes of node are not consecutive
+        L,R = lefts[0],rights[0]
+        for X in touched :
+            if X != L and X != R and touched[X] != len(members[X]) : return False
+        settled[node] = True # before the splits, which do not need to count the cliques of node anymore
+        splitL = touched[L] < len(members[L])
+        splitR = touched[R] < len(members[R])
+        if splitL :
+            split(L, {c for c in K[node] if cls[c] == L}, False)
+        if splitR :
+            split(R, {c for c in K[node] if cls[c] == R}, True)
+        return True
+
+    while True :
+        while len(queue) > 0 :
+            node = queue.popleft()
+            inQueue[node] = False
+            if not refine(node) : return None
+        X = None
+        while len(pending) > 0 :
+            c = pending.pop()
+            if len(members[c]) > 1 :
+                X = c
+                break
+        if X is None : break
+        # every node is either in cliques of X only (internal) or in all cliques of X, so the internal nodes
+        # decide the order of X on their own: split X in its components, or put an end clique first
+        count = {}
+        for c in members[X] :
+            for node in cliques[c] :
+                count[node] = count.get(node, 0) + 1
+        internal = {node for node in count if count[node] == len(K[node])}
+        subList = {node : [n for n in adjList[node] if n in internal] for node in internal}
+        seen = set()
+        components = []
+        for node in internal :
+            if node in seen : continue
+            comp = [node]
+            seen.add(node)
+            for u in comp :
+                for n in subList[u] :
+                    if n not in seen :
+                        seen.add(n)
+                        comp.append(n)
+            components.append(comp)
+        if len(components) > 1 :
+            for comp in components[:-1] :
+                X = split(X, {c for node in comp for c in K[node]}, True)
+        else :
+            # the last node of a LexBFS of an interval graph is in an end clique of a clique path
+            last = LexBFS(components[0], subList)[-1]
+            split(X, {K[last][0]}, True)
+
+    order = []
+    X = head[0]
+    while X is not None :
+        order.extend(members[X])
+        X = cnext[X]
+    index = {c : i for i, c in enumerate(order)}
+    model = {}
+    for node in peo :
+        ids = [index[c] for c in K[node]]
+        l,r = min(ids),max(ids)
+        if r - l + 1 != len(ids) : return None # the cliques of node are not consecutive
+        model[node] = (l, r)
+    return model
+
+class CSRGraph :
+    ''' A graph in compressed sparse row form, usable in place of an Adjacency List:
+        the nodes are numbered 0..n-1 in order of first appearance in the file, labels[v] is the
+        name of node v in the file & its neighbors are neighbors[offsets[v]:offsets[v+1]] '''
+
+    def __init__(self, labels, offsets, neighbors) :
+        self.labels = labels
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self.nodes = range(len(labels))
+
+    def __len__(self) :
+        return len(self.labels)
+
+    def __iter__(self) :
+        return iter(self.nodes)
+
+    def __getitem__(self, node) :
+        return self.neighbors[self.offsets[node]:self.offsets[node + 1]]
+
+def readEdges(graph, size = 1 << 20) :
+    ''' Input:  graph, an open text file with an edge "k j" in every line
+                size, the number of characters read at a time
+        Output: ends, an array('q') (or a list, if some node does not fit in 64 bits) with the two
+                nodes of every edge one after the other, read in chunks of size characters '''
+    ends = array('q')
+    rest = '' # a node that was cut at the end of the previous chunk
+    while True :
+        chunk = graph.read(size)
+        done = not chunk
+        chunk = rest + chunk
+        tokens = chunk.split()
+        rest = ''
+        if not done and tokens and not chunk[-1].isspace() :
+            rest = tokens.pop()
+        ints = [int(x) for x in tokens]
+        try :
+            ends += array('q', ints) if isinstance(ends, array) else ints
+        except OverflowError : # a node does not fit in 64 bits, keep python ints
+            ends = list(ends) + ints
+        if done : break
+    if len(ends) % 2 != 0 :
+        raise ValueError("every edge needs two nodes")
+    return ends
+
+def numpyCSR(ends) :
+    ''' Input:  ends, an array('q') with the two nodes of every edge one after the other
+        Output: labels, offsets, neighbors, the arrays of a CSRGraph, computed with numpy '''
+    ends = np.frombuffer(ends, dtype = np.int64)
+    uniq,first,inverse = np.unique(ends, return_index = True, return_inverse = True)
+    order = np.argsort(first) # the labels in order of first appearance
+    rank = np.empty(len(uniq), dtype = np.int64)
+    rank[order] = np.arange(len(uniq))
+    ids = rank[inverse.ravel()]
+    other = ids.reshape(-1, 2)[:, ::-1].ravel() # the other end of every edge
+    offsets = np.zeros(len(uniq) + 1, dtype = np.int64)
+    np.cumsum(np.bincount(ids, minlength = len(uniq)), out = offsets[1:])
+    neighbors = other[np.argsort(ids, kind = 'stable')] # a stable sort keeps the order of the edges
+    # python code iterates array('q') a lot faster than numpy arrays
+    return tuple(array('q', a.astype(np.int64).tobytes()) for a in (uniq[order], offsets, neighbors))
+
+def loadGraph(graph) :
+    ''' Input:  graph, an open text file with an edge "k j" in every line
+        Output: a CSRGraph of said edges, where the neighbors of every node are in the order of the edges,
+                so that every task gives the same results as with createAdjList '''
+    ends = readEdges(graph)
+    if np is not None and isinstance(ends, array) and len(ends) > 0 :
+        return CSRGraph(*numpyCSR(ends))
+    index = {} # the dense number of every label
+    ids = [index.setdefault(x, len(index)) for x in ends]
+    n = len(index)
+    labels = array('q', index) if isinstance(ends, array) else list(index)
+    offsets = array('q', bytes(8 * (n + 1)))
+    for v in ids :
+        offsets[v + 1] += 1
+    for v in range(n) :
+        offsets[v + 1] += offsets[v]
+    fill = offsets[:-1] # the next free place in the neighbors of every node
+    neighbors = array('q', bytes(8 * len(ids)))
+    for k in range(0, len(ids), 2) :
+        a,b = ids[k],ids[k + 1]
+        neighbors[fill[a]] = b
+        fill[a] += 1
+        neighbors[fill[b]] = a
+        fill[b] += 1
+    return CSRGraph(labels, offsets, neighbors)
+
+def components(csr) :
+    ''' Input:  csr, a CSRGraph
+        Output: comps, the connected components of the graph, found with one BFS over all of it, as sorted
+                lists of nodes & in order of their first node '''
+    comp = array('q', [-1]) * len(csr) # the component of every node
+    comps = []
+    for s in csr.nodes :
+        if comp[s] != -1 : continue
+        comp[s] = len(comps)
+        nodes = [s]
+        for node in nodes : # nodes grows while it is traversed, like a queue
+            for n in csr[node] :
+                if comp[n] == -1 :
+                    comp[n] = len(comps)
+                    nodes.append(n)
+        nodes.sort()
+        comps.append(nodes)
+    return comps
+
+def subgraph(csr, nodes) :
+    ''' Input:  csr, a CSRGraph
+                nodes, a sorted list of nodes of the graph that holds whole connected components
+        Output: a CSRGraph of said nodes, where the nodes keep their order & so do their neighbors '''
+    local = {node : i for i, node in enumerate(nodes)}
+    offsets = array('q', [0]) * (len(nodes) + 1)
+    for i, node in enumerate(nodes) :
+        offsets[i + 1] = offsets[i] + csr.offsets[node + 1] - csr.offsets[node]
+    neighbors = array('q', [local[n] for node in nodes for n in csr[node]])
+    labels = [csr.labels[node] for node in nodes]
+    if isinstance(csr.labels, array) :
+        labels = array('q', labels)
+    return CSRGraph(labels, offsets, neighbors)
+
+def runTask(task, csr) :
+    ''' Input:  task, one of available
+                csr, a CSRGraph
+        Output: the LexBFS sequence of the graph as labels for lexbfs, otherwise whether the graph is
+                chordal / interval '''
+    LexBFSList = LexBFS(csr.nodes, csr)
+    if task == "lexbfs" :
+        return [csr.labels[node] for node in LexBFSList]
+    if task == "chordal" :
+        return checkPEO(LexBFSList, csr)[0]
+    return intervalModel(LexBFSList, csr) is not None
+
+def parallelTask(task, csr, workers = None, comps = None) :
+    ''' Input:  task, one of available
+                csr, a CSRGraph
+                workers, the number of processes used, or None for one per cpu
+                comps, the components(csr) of the graph, or None to find them
+        Output: the same as runTask(task, csr), computed on groups of connected components in a process pool.
+                The LexBFS of a graph is the LexBFS of its components one after the other, in order of their
+                first node, so the sequences of the groups are joined in that order. Chordality & interval-ness
+                hold for a graph iff they hold for all of its components, so the first group that fails stops the rest '''
+    workers = workers or os.cpu_count() or 1
+    # the components are sent to the workers in groups of about the same size, as one graph each,
+    # since a lot of small graphs take longer to send than to check
+    size = max(1, (len(csr) + len(csr.neighbors)) // (4 * workers))
+    groups = [[]]
+    weight = 0
+    for nodes in comps if comps is not None else components(csr) :
+        if weight >= size :
+            groups.append([])
+            weight = 0
+        groups[-1].extend(nodes)
+        weight += len(nodes) + sum(csr.offsets[node + 1] - csr.offsets[node] for node in nodes)
+    with ProcessPoolExecutor(workers) as pool :
+        futures = [pool.submit(runTask, task, subgraph(csr, sorted(group))) for group in groups]
+        if task == "lexbfs" :
+            return [label for future in futures for label in future.result()]
+        for future in as_completed(futures) :
+            if not future.result() :
+                for other in futures :
+                    other.cancel()
+                return False
+    return True
+
+class DynamicGraph :
+    ''' A graph that changes an edge at a time & keeps track of whether it is chordal. While it is chordal,
+        every change is checked locally around the changed edge. While it is not, the chordless cycle found by
+        checkPEO is kept, and the graph stays not chordal as long as no edge between 2 nodes of the cycle is
+        added or removed. Otherwise chordality is computed again with LexBFS & checkPEO, only when it is asked for '''
+
+    def __init__(self, edges = ()) :
+        self.adjList = {} # the neighbors of every node, as sets
+        for u,v in edges :
+            self.node(u).add(v)
+            self.node(v).add(u)
+        self.chordal = None if self.adjList else True # None, when it has to be computed again
+        self.cycle = None # the nodes of a chordless cycle of length > 3, when the graph is not chordal
+
+    def node(self, u) :
+        ''' Output: the neighbors of u, after adding u to the graph if it is not there '''
+        if u not in self.adjList :
+            self.adjList[u] = set()
+        return self.adjList[u]
+
+    def isChordal(self) :
+        ''' Output: whether the graph is chordal '''
+        if self.chordal is None :
+            nodes = list(self.adjList)
+            self.chordal,cert = checkPEO(LexBFS(nodes, self.adjList), self.adjList)
+            self.cycle = set(cert) if not self.chordal and len(cert) > 3 else None
+        return self.chordal
+
+    def separates(self, S, u, v) :
+        ''' Input:  S, a set of nodes
+                    u, v, two nodes that are not in S
+            Output: whether every path from u to v goes through S, found with two BFS from u & v that take
+                    turns, so that the smaller side of the separation is all that gets traversed '''
+        seen = ({u}, {v})
+        queues = (deque([u]), deque([v]))
+        while queues[0] and queues[1] :
+            for side in (0, 1) :
+                node = queues[side].popleft()
+                for n in self.adjList[node] :
+                    if n in S or n in seen[side] : continue
+                    if n in seen[1 - side] :
+                        return False
+                    seen[side].add(n)
+                    queues[side].append(n)
+                if not queues[side] :
+                    return True
+        return True
+
+    def kept(self, u, v) :
+        ''' Input:  u, v, the nodes of an edge that is added or removed
+            Output: whether the graph is known to be not chordal after said change, because the chordless cycle
+                    found before does not have both u & v, so it is still a chordless cycle '''
+        return self.chordal is False and self.cycle is not None and not (u in self.cycle and v in self.cycle)
+
+    def insert(self, u, v) :
+        ''' Input:  u, v, the nodes of a new edge
+            Output: whether the graph is chordal after adding the edge. A chordal graph stays chordal
+                    iff the common neighbors of u & v separate u from v before the edge is added '''
+        nu = self.node(u)
+        nv = self.node(v)
+        if u == v or v in nu :
+            return self.isChordal()
+        if self.chordal :
+            self.chordal = self.separates(nu & nv, u, v) # a cycle is found by the next computation, if needed
+        elif not self.kept(u, v) :
+            self.chordal = None
+        nu.add(v)
+        nv.add(u)
+        return self.isChordal()
+
+    def delete(self, u, v) :
+        ''' Input:  u, v, the nodes of an edge
+            Output: whether the graph is chordal after removing the edge. A chordal graph stays chordal
+                    iff the common neighbors of u & v are a clique '''
+        if u not in self.adjList or v not in self.adjList[u] :
+            return self.isChordal()
+        nu = self.adjList[u]
+        nv = self.adjList[v]
+        nu.discard(v)
+        nv.discard(u)
+        if self.chordal :
+            common = nu & nv
+            self.chordal = all(len(common & self.adjList[w]) == len(common) - 1 for w in common)
+        elif not self.kept(u, v) :
+            self.chordal = None
+        return self.isChordal()
+
+def dynamic(updates, out, graph = None) :
+    ''' Input:  updates, an iterable of lines "+ k j" (or "k j") & "- k j", that add & remove the edge k j
+                out, the file the answers are written in
+                graph, a CSRGraph to start from, or None for an empty graph
+        Result: after every update, whether the graph is chordal is written in out '''
+    edges = ()
+    if graph is not None :
+        edges = ((graph.labels[u], graph.labels[v]) for u in graph.nodes for v in graph[u] if u < v)
+    dynamicGraph = DynamicGraph(edges)
+    for line in updates :
+        tokens = line.split()
+        if not tokens : continue
+        if tokens[0] in ("+", "-") :
+            op = tokens.pop(0)
+        else :
+            op = "+"
+        u,v = (int(x) for x in tokens)
+        chordal = dynamicGraph.insert(u, v) if op == "+" else dynamicGraph.delete(u, v)
+        out.write(str(chordal) + "\n")
+
+@lru_cache(maxsize = 16)
+def cachedGraph(file, mtime) :
+    ''' Input:  file, the path of a file with the edges of a graph
+                mtime, the modification time of said file, so that a changed file is loaded again
+        Output: entry, a dictionary with the CSRGraph of said file in "csr", where the LexBFS sequence, the
+                components & the results of the tasks are kept once they are computed. The 16 most
+                recently used graphs are kept '''
     with open(file) as graph :
-        nodes = []
-        edges = []
-        line = graph.readline()
-        while line:
-            nums = line.split(" ")
-            nums = [int(x) for x in nums]
-            edges.append([nums[0],nums[1]])
-            for i in nums :
-                if i not in nodes :
-                    nodes.append(i)
-            line = graph.readline()
-except FileNotFoundError :
+        return {"csr" : loadGraph(graph)}
+
+def memo(entry, key, compute) :
+    ''' Input:  entry, a dictionary of cachedGraph
+                key, the name of a value derived from the graph
+                compute, a function that computes said value
+        Output: the value kept in entry under key, computed the first time it is asked '''
+    if key not in entry :
+        entry[key] = compute()
+    return entry[key]
+
+def cachedTask(task, file, parallel = False, workers = None) :
+    ''' Input:  task, one of available
+                file, the path of a file with the edges of a graph
+                parallel, whether to run the task on the components in a process pool
+                workers, with parallel, the number of processes used
+        Output: the result of runTask(task, csr) for the graph of file, where the graph, its LexBFS
+                sequence, perfect elimination ordering, components & the result are reused between calls '''
+    entry = cachedGraph(file, os.stat(file).st_mtime_ns)
+    csr = entry["csr"]
+    if task in entry :
+        return entry[task]
+    if parallel :
+        comps = memo(entry, "components", lambda : components(csr))
+        return memo(entry, task, lambda : parallelTask(task, csr, workers, comps))
+    LexBFSList = memo(entry, "LexBFSList", lambda : LexBFS(csr.nodes, csr))
+    if task == "lexbfs" :
+        return memo(entry, task, lambda : [csr.labels[node] for node in LexBFSList])
+    chordal,peo = memo(entry, "peo", lambda : checkPEO(LexBFSList, csr))
+    if task == "chordal" :
+        return memo(entry, task, lambda : chordal)
+    return memo(entry, task, lambda : chordal and intervalModel(LexBFSList, csr, (chordal, peo)) is not None)
+
+def serve(queries, out, workers = None) :
+    ''' Input:  queries, an iterable of json lines like {"task" : "chordal", "file" : "graph.txt"}, with an
+                optional "parallel" : true
+                out, the file the answers are written in
+                workers, the number of processes used for the parallel queries
+        Result: every query is answered with a json line, {"result" : ...} or {"error" : ...}, as soon as it is read.
+                The graphs & everything derived from them are kept between queries by cachedTask '''
+    for line in queries :
+        if not line.strip() : continue
+        try :
+            query = json.loads(line)
+            task = query["task"]
+            if task not in available :
+                answer = {"error" : "Not an acceptable task"}
+            elif not isinstance(query["file"], str) : # os.stat & open would take an int for a file descriptor
+                answer = {"error" : "bad query: the file must be a string"}
+            else :
+                answer = {"result" : cachedTask(task, query["file"], query.get("parallel", False), workers)}
+        except FileNotFoundError :
+            answer = {"error" : "404: File not Found"}
+        except OSError as e : # a directory or a file that can not be read
+            answer = {"error" : "can not read the file: " + str(e)}
+        except (ValueError, KeyError, TypeError, AttributeError) as e : # a malformed query or graph
+            answer = {"error" : "bad query: " + repr(e)}
+        out.write(json.dumps(answer) + "\n")
+        out.flush()
+
+# ---MAIN THREAD---
+
+def main(args) :
+    ''' Input:  args, the command line arguments
+        Result: the result of the given task on the graph of the given file is printed '''
+    parser = argparse.ArgumentParser()
+    parser.add_argument('task', nargs = '?', help = 'one of ' + ", ".join(available) + ", or dynamic")
+    parser.add_argument('file', nargs = '?', help = 'the file with the edges of the graph, or with the updates ("+ k j" / "- k j") '
+                                                    'for dynamic, where - is stdin')
+    parser.add_argument('--graph', help = 'with dynamic, the file with the edges of the graph the updates start from')
+    parser.add_argument('--serve', action = 'store_true', help = 'answer json lines of queries from stdin, keeping the graphs loaded')
+    parser.add_argument('--parallel', action = 'store_true', help = 'run the task on every connected component in a process pool')
+    parser.add_argument('-j', dest = 'workers', type = int, help = 'with --parallel or --serve, the number of processes used')
+    args = parser.parse_args(args[1:])
+    if args.serve :
+        serve(sys.stdin, sys.stdout, args.workers)
+        return
+    if args.file is None :
+        parser.error("the task & the file are required")
+    task = args.task
+    if task not in available and task != "dynamic" :
+        exit("Not an acceptable task. Program termination")
+    # construct the graph
+    try :
+        if task == "dynamic" :
+            csr = None
+            if args.graph is not None :
+                with open(args.graph) as graph :
+                    csr = loadGraph(graph)
+            if args.file == "-" :
+                dynamic(sys.stdin, sys.stdout, csr)
+            else :
+                with open(args.file) as updates :
+                    dynamic(updates, sys.stdout, csr)
+            return
+        with open(args.file) as graph :
+            csr = loadGraph(graph)
+    except FileNotFoundError :
         print("404: File not Found")
-# create the adjancency list of given graph
-adjList = createAdjList(nodes, edges)
-# get the LexBFS sequence of said graph
-LexBFSList = LexBFSseq(nodes, adjList)
-if task == "lexbfs" :
-    print(LexBFSList)
-elif task == "chordal" :
-    print(isChordal(LexBFSList, adjList))
-else :
-    print(isInterval(LexBFSList,adjList))
+        return
+    if args.parallel :
+        print(parallelTask(task, csr, args.workers))
+    else :
+        print(runTask(task, csr))
+
+if __name__ == "__main__" :
+    main(argv)
@@ -0,0 +1,179 @@
+import argparse
+import io
+import json
+import platform
+import random
+import sys
+from time import perf_counter
+
+import commentz_walter as cw
+
+def randomText(n, rng, alphabet = 'abcdefghijklmnopqrstuvwxyz') :
+    ''' Input :  n, the amount of characters
+                 rng, a random.Random
+                 alphabet, the characters of the text
+        Output:  a text of n characters of alphabet, picked uniformly at random '''
+    return ''.join(rng.choice(alphabet) for i in range(n))
+
+def naturalText(n, rng) :
+    ''' Input :  n, the amount of characters
+                 rng, a random.Random
+        Output:  a text of n characters that looks like natural language: words made of common syllables, with a
+                 few of them far more frequent than the rest (Zipf's law), spaces, punctuation & lines '''
+    syllables = ['th', 'e', 'an', 'in', 'er', 'on', 're', 'at', 'en', 'es', 'o', 'a', 'is', 'it', 'or', 'ti', 'st', 'al']
+    words = list({''.join(rng.choice(syllables) for i in range(rng.randint(1, 4))) for k in range(500)})
+    weights = [1 / (rank + 1) for rank in range(len(words))]
+    text = []
+    length = 0
+    while length < n :
+        sentence = ' '.join(rng.choices(words, weights, k = rng.randint(3, 15)))
+        sentence = sentence[0].upper() + sentence[1:] + rng.choice(['.', '.', '.', ',', '?']) + rng.choice([' ', ' ', '\n'])
+        text.append(sentence)
+        length += len(sentence)
+    return ''.join(text)[:n]
+
+generators = {
+    "random" : randomText,
+    "natural" : naturalText,
+}
+
+def patternSet(t, count, pmin, rng) :
+    ''' Input :  t, a text
+                 count, the amount of patterns
+                 pmin, the length of the smallest pattern
+                 rng, a random.Random
+        Output:  count patterns, of pmin to pmin + 4 characters (exactly pmin for the first one), where half are
+                 taken from t so that they are found & the rest are random strings of the characters of t '''
+    alphabet = sorted(set(t))
+    ps = []
+    for k in range(count) :
+        length = pmin if k == 0 else rng.randint(pmin, pmin + 4)
+        if k % 2 == 0 and len(t) >= length :
+            start = rng.randrange(len(t) - length + 1)
+            ps.append(t[start:start + length])
+        else :
+            ps.append(''.join(rng.choice(alphabet) for i in range(length)))
+    return ps
+
+def engineNames() :
+    ''' Output:  the names of the engines that can search the current patterns, the text search of CommentzWalter
+                 ("text", the original implementation) first '''
+    return ["text"] + [e for e in cw.engines if e != "horspool" or len(set(cw.patterns)) == 1]
+
+def search(engine, t, data, stats = None) :
+    ''' Input :  engine, the name of an engine or "text"
+                 t, data, the text as a string & as bytes
+                 stats, the dictionary given to CommentzWalter, for the text engine
+        Output:  the set of (m, i) tuples of the patterns m found by said engine & the indexes i where they start '''
+    if engine == "text" :
+        return set(cw.CommentzWalter(t, 0, stats))
+    return {(cw.patterns[k], i) for k, i in cw.matcher(engine)(data)}
+
+def measure(ps, t, data, engine) :
+    ''' Input :  ps, a list of patterns
+                 t, data, the text as a string & as bytes
+                 engine, the name of an engine or "text"
+        Output:  a dictionary with the summary of the search (the seconds of building the tables & of searching,
+                 and the counts of CommentzWalter for the text engine) and the set of matches '''
+    begin = perf_counter()
+    cw.build(ps)
+    if engine != "text" :
+        cw.matcher(engine)
+    preprocessing = perf_counter() - begin
+    stats = {} if engine == "text" else None
+    begin = perf_counter()
+    matches = search(engine, t, data, stats)
+    scanning = perf_counter() - begin
+    result = cw.summary(stats or {}, preprocessing, scanning)
+    result["total_s"] = preprocessing + scanning
+    result["MiB_s"] = len(data) / scanning / (1 << 20) if scanning else None
+    return result, matches
+
+def bruteForce(ps, t) :
+    ''' Input :  ps, a list of patterns
+                 t, a text
+        Output:  the set of (m, i) tuples of every pattern m & every index i where it starts in t '''
+    matches = set()
+    for m in set(ps) :
+        i = t.find(m)
+        while i != -1 :
+            matches.add((m, i))
+            i = t.find(m, i + 1)
+    return matches
+
+def oracle(runs, rng) :
+    ''' Input :  runs, the amount of small random texts & pattern sets
+                 rng, a random.Random
+        Output:  mismatches, a list with the (engine, patterns, text) for which an engine found different matches
+                 than a brute force search ("text" is the original implementation, "chunks" is scan with small chunks) '''
+    mismatches = []
+    for run in range(runs) :
+        t = randomText(rng.randint(0, 60), rng, 'abc'[:rng.randint(1, 3)] + 'd')
+        ps = [randomText(rng.randint(1, 5), rng, 'abcd') for k in range(rng.randint(1, 6))]
+        if rng.random() < 0.3 :
+            ps.append(rng.choice(ps)) # a pattern that is given twice
+        expected = bruteForce(ps, t)
+        cw.build(ps)
+        found = {name : search(name, t, t.encode('latin-1')) for name in engineNames()}
+        found["chunks"] = set(cw.scan(io.StringIO(t), size = rng.randint(1, 8)))
+        for name, matches in found.items() :
+            if matches != expected :
+                mismatches.append({"engine" : name, "patterns" : ps, "text" : t})
+    return mismatches
+
+def main(args) :
+    ''' Input :  args, the command line arguments
+        Result:  every engine is timed on random & natural-language-like texts of every size, for pattern sets of
+                 every size & pmin, its matches are checked against the original implementation, and the results
+                 are printed as json '''
+    parser = argparse.ArgumentParser(description = 'benchmark the engines of commentz_walter.py')
+    parser.add_argument('--sizes', type = int, nargs = '+', default = [1 << 16, 1 << 18], help = 'the amounts of characters of the texts')
+    parser.add_argument('--texts', nargs = '+', default = list(generators), choices = list(generators))
+    parser.add_argument('--counts', type = int, nargs = '+', default = [1, 10, 100], help = 'the amounts of patterns')
+    parser.add_argument('--pmins', type = int, nargs = '+', default = [2, 4, 8], help = 'the lengths of the smallest pattern')
+    parser.add_argument('--engines', nargs = '+', default = list(cw.engines), choices = list(cw.engines))
+    parser.add_argument('--oracle-runs', type = int, default = 500, help = 'the amount of small random inputs every engine is checked on')
+    parser.add_argument('--seed', type = int, default = 0)
+    parser.add_argument('-o', dest = 'output', help = 'write the json in this file instead of stdout')
+    args = parser.parse_args(args[1:])
+    rng = random.Random(args.seed)
+
+    results = []
+    for n in args.sizes :
+        for kind in args.texts :
+            t = generators[kind](n, rng)
+            data = t.encode('latin-1')
+            for count in args.counts :
+                for pmin in args.pmins :
+                    ps = patternSet(t, count, pmin, rng)
+                    cw.build(ps)
+                    chosen = cw.chooseEngine()[0]
+                    names = [e for e in engineNames() if e == "text" or e in args.engines]
+                    expected = None
+                    for engine in names :
+                        result, matches = measure(ps, t, data, engine)
+                        if expected is None :
+                            expected = matches
+                        result.update({"text" : kind, "n" : n, "patterns" : count, "pmin" : pmin, "engine" : engine,
+                                       "auto" : engine == chosen, "matches" : len(matches), "identical" : matches == expected})
+                        results.append(result)
+                        print(kind, n, count, pmin, engine, round(result["total_s"],3), "s", file = sys.stderr)
+
+    mismatches = oracle(args.oracle_runs, rng)
+    report = {
+        "python" : platform.python_version(),
+        "results" : results,
+        "oracle" : {"runs" : args.oracle_runs, "mismatches" : mismatches},
+    }
+    text = json.dumps(report, indent = 2)
+    if args.output is None :
+        print(text)
+    else :
+        with open(args.output, "w") as out :
+            out.write(text + "\n")
+    different = [r for r in results if not r["identical"]]
+    if mismatches or different :
+        exit("an engine found different matches than the original implementation")
+
+if __name__ == "__main__" :
+    main(sys.argv)
@@ -1,127 +1,98 @@
 import argparse
+import hashlib
+import io
+import mmap
+import multiprocessing
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
 from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from glob import glob
+from itertools import repeat
+from time import perf_counter
 
-# add switches to allow user choices of execution in cli
-parser = argparse.ArgumentParser()
-parser.add_argument('-v', action = 'store_true', help = 'print the s1 & s2 arrays along the results')
-parser.add_argument('tinput', nargs='*', action = 'store', help = 'match the given strings in the file')
-args = parser.parse_args()
+patterns = [] # the patterns, sorted by length
+trie = [{}] # trie[n], the children of node n, where trie[n][c] is the child connected to n with c
+parent = [None]
+depth = [0]
+isEndNode = [False]
 
-patterns = args.tinput[0:len(args.tinput) - 1] # the patterns
-patterns.sort(key = len)
-
-if len(patterns) < 1:
-    exit("invalid input. Program termination")
-if ".txt" not in args.tinput[-1] :
-    exit("invalid file input. Program termination")
-
-file = args.tinput[-1] # the file that contains the text
-
-def chain(word) :
-    ''' Input :  word, a String
-        Data  :  trie, a trie that represents some patterns
-                 isEndNode, a dictionary that containts the nodes of the trie, where isEndNode[node] 
-                 is True if the traversal from root to node represents a pattern
-        Result:  word gets added in trie as a whole new pattern in new nodes and edges, trie and isEndNode are changed '''
-    node = max(trie.keys())
-    n = len(word) + 1
-    for i in range(n) :
-        trie.setdefault(node + i + 1, [])
-    for index, i in enumerate(word) :
-        trie[node + index + 1].append((node + index + 2, i))
-        isEndNode[node + index + 1] = False
-
-def DFS(trie, node, word) :
+def addNode(trie, node, c) :
     ''' Input :  trie, a trie that represents some patterns
                  node, a node in trie
+                 c, a character
+        Data  :  parent, depth, lists where parent[n] & depth[n] are the parent & the depth of node n in trie
+                 isEndNode, a list where isEndNode[n] is True if the traversal from root to n represents a pattern
+        Output:  child, a new node connected to node with c, numbered after the nodes that were created before it.
+                 trie, parent, depth and isEndNode are changed '''
+    child = len(trie)
+    trie.append({})
+    trie[node][c] = child
+    parent.append(node)
+    depth.append(depth[node] + 1)
+    isEndNode.append(False)
+    return child
+
+def insert(trie, word) :
+    ''' Input :  trie, a trie that represents some patterns
                  word, a String
-        Data  :  isEndNode, a dictionary that containts the nodes of the trie, where isEndNode[node] 
-                 is True if the traversal from root to node represents a pattern
-        Result:  trie is traversed (Depth-First) from node to try to add word it it
-                 word is added in trie, trie and isEndNode are changed '''
-    found = False
-    for i in trie[node] :
-        if i[1] == word[0] :
-            found = True
-            if len(word) > 1 :
-                DFS(trie, i[0], word[1:]) # while you match a letter in the trie, keep traversing the trie Depth-First
-    if not found :
-        trie[node].append((max(trie.keys()) + 1, word[0]))
-        chain(word[1:]) # if you find a letter that does not match, add the rest of the word in trie as new nodes
-    isEndNode[max(trie.keys())] = True
+        Data  :  isEndNode, a list where isEndNode[n] is True if the traversal from root to n represents a pattern
+        Result:  word is added in trie, by following the nodes of its longest prefix that is already in trie
+                 and adding a new node for every character after it. trie and isEndNode are changed '''
+    node = 0
+    for c in word :
+        child = trie[node].get(c)
+        if child is None :
+            child = addNode(trie, node, c)
+        node = child
+    isEndNode[node] = True
 
 def hasChild(trie, node, weight) :
     ''' Input :  trie, a trie that represents some patterns
                  node, a node in trie
                  weight, a character
-        Output:  True if node in trie has a child connected with weight, False otherwise '''    
-    if node not in trie.keys() : return False # the node does not exist in the trie, return False
-    data = [n[1] for n in trie[node]]
-    return weight in data
+        Output:  True if node in trie has a child connected with weight, False otherwise '''
+    if not 0 <= node < len(trie) : return False # the node does not exist in the trie, return False
+    return weight in trie[node]
 
 def getChild(trie, node, weight):
     ''' Input :  trie, a trie that represents some patterns
                  node, a node in trie
                  weight, a character
-        Output:  n, the child that is connected to node in trie with weight '''
-    if hasChild(trie, node, weight) : # if the node does not exist in the trie, this will fail and the getChild() method will return None
-        for n in trie[node] :
-            if n[1] == weight :
-                return n[0]
-    else :
-        return None
+        Output:  n, the child that is connected to node in trie with weight
+                 None, if there is no such child or node does not exist in trie '''
+    if not 0 <= node < len(trie) : return None # the node does not exist in the trie
+    return trie[node].get(weight)
 
 def getParent(trie, node) :
     ''' Input :  trie, a trie that represents some patterns
                  node, a node in trie
+        Data  :  parent, a list where parent[n] is the parent of node n in trie
         Output:  k, the parent that is connected to node in trie
                  None, if node doesnt have a parent or does not exist in trie '''
-    if isRoot(trie, node) : return None # the node is the root, it doesn't have a parent
-    stack = deque()
-    stack.appendleft(0) # start from node 0, the root
-    while len(stack) > 0 :
-        u = stack.popleft() # traverse the trie Depth-First to find the parent that connects to node
-        for k in trie[u] :
-            if k[0] == node : return u
-            stack.appendleft(k[0])
-    return None # the node does not exist in the trie
+    if not 0 <= node < len(trie) : return None # the node does not exist in the trie
+    return parent[node] # the root has None as its parent
 
 def isRoot(trie, node) :
     ''' Input :  trie, a trie that represents some patterns
                  node, a node in trie
         Output:  True if node is root of trie, False if not
                  None, if node does not exist in trie '''
-    if node not in trie.keys() : return None # the node does not exist in the trie
-    stack = deque()
-    stack.appendleft(0) # start from node 0, the root
-    while len(stack) > 0 :
-        u = stack.popleft()
-        for n in trie[u] :
-            if n[0] == node : return False # if node is found while traversing the trie, it means that it's not the root
-            stack.appendleft(n[0])
-    return True # since we know node is in trie (line 93), if we didnt find it while traversing the trie this way, 
-                # it means that node is the root
+    if not 0 <= node < len(trie) : return None # the node does not exist in the trie
+    return node == 0 # the root is the first node that was created
 
 def d(node) :
     ''' Input :  node, a node in a trie
         Data  :  trie, a trie that represents some patterns
+                 depth, a list where depth[n] is the depth of node n in trie
         Output:  d, the depth of node in trie
                  -1, if node does not exist in trie '''
-    if node not in trie.keys() : return -1 # the node does not exist in the trie
-    if isRoot(trie, node) : return 0; # the depth of the root is 0
-    d = 0 # starting depth
-    queue = deque([0])
-    queue.append(len(trie)) # add a sentinel value that represents a border between different depths of children in the queue
-    while len(queue) > 1 :
-        u = queue.popleft()
-        if u == len(trie) :
-            d += 1
-            queue.append(len(trie)) # if the sentinel value reaches the start of the queue, append it to the end again
-            for q in queue :
-                if q == node : return d # check the whole queue for the node, if it exists in it, then its depth will be d
-            u = queue.popleft() # pop again to take a node
-        for v in trie[u] :
-            queue.append(v[0]) # add the children of the previously poped node and add them to the end of the queue
+    if not 0 <= node < len(trie) : return -1 # the node does not exist in the trie
+    return depth[node]
 
 def createRt(pmin, trie, t) :
     ''' Input :  pmin, the length of the smallest pattern
@@ -129,46 +100,38 @@ def createRt(pmin, trie, t) :
                  t, the text that we will look to match our patterns
         Output:  rt, the right-most array of our patterns, where rt[c] containts the most right
                  appearance of c and pmin + 1 if c does not exist in the patterns '''
-    chars = []
     rt = dict()
-    full = patterns + [t] # the whole alphabet that we will be considering for the algorithm (the full set of the characters in the text and in the patterns)
-    for p in full :
-        for c in p :
-            if c not in chars :
-                chars.append(c) # list with the full set of characters that appear in the text and in the patterns
-    for c in chars :
-        k = []
-        for list in trie.values() :
-            for tuple in list :
-                if tuple[1] == c : # append all the depths of the character we are traversing in the trie (if the char does not exist in the trie, k will be empty)
-                    k.append(d(tuple[0]))
-        k.append(pmin + 1) # append pmin + 1 in k so we can take the min of all
-        rt[c] = min(k)
-    return rt     
-    
+    for p in patterns + [t] : # the whole alphabet that we will be considering for the algorithm (the full set of the characters in the text and in the patterns)
+        for c in set(p) :
+            rt[c] = pmin + 1
+    for children in trie :
+        for c, child in children.items() : # keep the smallest depth of every character in the trie
+            if d(child) < rt[c] :
+                rt[c] = d(child)
+    return rt
+
 def createFailure(trie) :
     ''' Input :  trie, a trie that represents some patterns
         Output:  failure, an array where failure[n] = v so w[v] is the largest suffix of w(n), or 0
                  if it does not exist. w(i) is the pattern that is being formed if we traverse the trie 
-                 from root to i '''
+                 from root to i. The nodes are kept in failure in Breadth-First order '''
     failure = dict()
-    nodes = [n[0] for n in trie[0]] # save the kids of the root node (the nodes that are on depth 1)
+    nodes = list(trie[0].values()) # save the kids of the root node (the nodes that are on depth 1)
     failure[0] = 0 # root node
     for node in nodes :
         failure[node] = 0 
     queue = deque(nodes)
     while len(queue) > 0 :
         u = queue.popleft()
-        for v in trie[u] :
-            queue.append(v[0])
+        for c, v in trie[u].items() :
+            queue.append(v)
             ut = failure[u]
-            c = v[1]
             while not hasChild(trie, ut, c) and not isRoot(trie, ut) :
                 ut = failure[ut]
             if hasChild(trie, ut, c) :
-                failure[v[0]] = getChild(trie, ut, c)
+                failure[v] = getChild(trie, ut, c)
             else :
-                failure[v[0]] = 0
+                failure[v] = 0
     return failure
 
 def createSet1(failure) :
@@ -177,141 +140,732 @@ def createSet1(failure) :
                  that are of deeper depth in the trie from u and w(u) is the largest suffix of w(v) for every
                  v in set1[u] '''
     set1 = dict()
-    for i in failure.values() :
+    for j, i in failure.items() :
         if i == 0 : continue # dont consider nodes that have 0 in the failure array
-        s = set()
-        for j in failure.keys() :
-            if failure[j] == i :
-                s.add(j)
-        set1[i] = s
+        set1.setdefault(i, set()).add(j)
     return set1
 
-def createSet2(set1) :
-    ''' Input :  set1, a dictionary
-        Data  :  isEndNode, a dictionary that containts the nodes of a trie, where isEndNode[node] 
-                 is True if the traversal from root to node represents a pattern
-        Output:  set2, a dictionary where set2[u] is a subset of set1[u] so that every
-                 path from nodes in set1[u] is a pattern '''
+def createSet2(failure) :
+    ''' Input :  failure, an array
+        Data  :  isEndNode, a list where isEndNode[node] is True if the traversal from root to node
+                 of a trie represents a pattern
+        Output:  set2, a dictionary where set2[u] contains the nodes v, so that w(v) is a pattern and w(u)
+                 is a suffix of w(v), the nodes of set1[u] that are patterns & the ones further down their
+                 failure chains. Every pattern node is added to as many sets as its depth at most '''
     set2 = dict()
-    for i in set1.keys() :
-        s = set()
-        for j in set1[i] :
-            if isEndNode[j] :
-                s.add(j)
-        if len(s) > 0 :
-            set2[i] = s
+    for v in failure :
+        if not isEndNode[v] : continue
+        u = failure[v]
+        while u != 0 : # w(u) is a suffix of w(v) for every u in the failure chain of v
+            set2.setdefault(u, set()).add(v)
+            u = failure[u]
     return set2
 
-def createS1(pmin, set1, r) :
+def createS1(pmin, set1, failure) :
     ''' Input :  pmin, the length of the smallest pattern
                  set1, a dictionary
-                 r, the root of the trie
-        Data  :  trie, a trie that represents some patterns
+                 failure, an array with the nodes of the trie in Breadth-First order
         Output:  s1, an array where s1[u] = min(pmin, {d(ut) - d(u) for every ut in set1[u]}) if u is not the root
                  and s1[u] = 1 if u is the root '''
-    s1 = [0] * len(trie)
-    stack = deque()
-    stack.appendleft(r)
-    while len(stack) > 0 :
-        u = stack.popleft()
-        for n in trie[u] :
-            stack.appendleft(n[0])
-        if u == r :
+    s1 = [0] * len(failure)
+    for u in failure :
+        if u == 0 :
             s1[0] = 1
         else :
             k = []
-            if u in set1.keys() : # if set1[u] does not exist, dont consider it in the computation and take pmin
+            if u in set1 : # if set1[u] does not exist, dont consider it in the computation and take pmin
                 k = [d(ut) - d(u) for ut in set1[u]] # the difference of depth of the u we are traversing with every ut that belongs in set1[u]
             k.append(pmin) # append pmin in k so we can take the min of all
-            s1[u] = min(k)       
+            s1[u] = min(k)
     return s1
 
-def createS2(pmin, set2, r) :
+def createS2(pmin, set2, failure) :
     ''' Input :  pmin, the length of the smallest pattern
                  set2, a dictionary
-                 r, the root of the trie
+                 failure, an array with the nodes of the trie in Breadth-First order, so that the parent of
+                 every node comes before it
         Data  :  trie, a trie that represents some patterns
         Output:  s2, an array where s2[u] = min(s2[parent(u)], {d(ut) - d(u) for every ut in set2[u]}) if u is not the root
                  and s1[u] = pmin if u is the root '''
-    s2 = [0] * len(trie)
-    stack = deque()
-    stack.appendleft(r)
-    while len(stack) > 0 :
-        u = stack.popleft()
-        for n in trie[u] :
-            stack.appendleft(n[0])
-        if u == r :
+    s2 = [0] * len(failure)
+    for u in failure :
+        if u == 0 :
             s2[0] = pmin
         else :
             k = []
-            if u in set2.keys() : # if set2[u] does not exist, dont consider it in the computation and take pmin
+            if u in set2 : # if set2[u] does not exist, dont consider it in the computation and take pmin
                 k = [d(ut) - d(u) for ut in set2[u]] # the difference of depth of the u we are traversing with every ut that belongs in set2[u]
             k.append(s2[getParent(trie, u)]) # append in k so we can take the min of all
             s2[u] = min(k)
     return s2
 
-def CommentzWalter(t) :
+def preprocess(pmin, trie, t) :
+    ''' Input :  pmin, the length of the smallest pattern
+                 trie, a trie that represents the reversed patterns
+                 t, the text that we will look to match our patterns
+        Output:  rt, failure, set1, set2, s1, s2, the tables of the algorithm, computed from a single
+                 Breadth-First traversal of trie (the order of failure) in time linear to the total length
+                 of the patterns, apart from the walks up the failure links '''
+    rt = createRt(pmin, trie, t)
+    failure = createFailure(trie)
+    set1 = createSet1(failure)
+    set2 = createSet2(failure)
+    s1 = createS1(pmin, set1, failure)
+    s2 = createS2(pmin, set2, failure)
+    return rt, failure, set1, set2, s1, s2
+
+def CommentzWalter(t, start = 0, stats = None) :
     ''' Input :  t, the text we will look to match our patterns
+                 start, the first index of t where a match can end to be reported
+                 stats, a dictionary where the counts of the search are added, or None
         Data  :  trie, a trie that represents the reversed patterns
                  pmin, the length of the smallest pattern
-                 rt, the right-most array of appearances of characters
+                 rt, the right-most array of appearances of characters, pmin + 1 for the ones that it does not have
                  s1
                  s2
-        Output:  q, a queue that contains (m, i) tuples where m is the pattern and i the index it was found it t '''
-    q = deque()
+        Output:  a generator of (m, i) tuples where m is the pattern and i the index it was found in t,
+                 in order of the index where the match ends. With stats, the search is countedCommentzWalter '''
+    if stats is not None : # the counting loop is kept apart, so that the search does not pay for it
+        yield from countedCommentzWalter(t, start, stats)
+        return
     i = pmin - 1
     j = 0
     u = 0
     m = ''
     while i < len(t) :
-        while hasChild(trie, u, t[i - j]) :
-            u = getChild(trie, u, t[i - j])
+        child = getChild(trie, u, t[i])
+        while child is not None : # one lookup per character
+            u = child
             m += t[i - j]
             j += 1
-            if isEndNode[u] :
-                q.append((m[::-1], i - j + 1))
+            if isEndNode[u] and i >= start :
+                yield m[::-1], i - j + 1
+            if j > i : break # the start of t was reached
+            child = getChild(trie, u, t[i - j])
         if j > i :
             j = i
-        s = min(s2[u], max(s1[u], rt[t[i - j]] - j - 1))
+        s = min(s2[u], max(s1[u], rt.get(t[i - j], pmin + 1) - j - 1))
         i += s
         j = 0
         u = 0
         m = ''
-    return q
 
+def countedCommentzWalter(t, start, stats) :
+    ''' Input :  t, start, like CommentzWalter
+                 stats, a dictionary where the counts of the search are added
+        Output:  the generator of CommentzWalter(t, start). When it ends or is closed, stats["shifts"], stats["shifted"]
+                 & stats["compared"] are increased by the amount of shifts, the sum of their lengths & the amount
+                 of characters of t compared with the trie '''
+    i = pmin - 1
+    j = 0
+    u = 0
+    m = ''
+    shifts = 0
+    compared = 0
+    try :
+        while i < len(t) :
+            child = getChild(trie, u, t[i])
+            while child is not None :
+                u = child
+                m += t[i - j]
+                j += 1
+                if isEndNode[u] and i >= start :
+                    yield m[::-1], i - j + 1
+                if j > i : break
+                child = getChild(trie, u, t[i - j])
+            if j > i :
+                compared += j
+                j = i
+            else :
+                compared += j + 1 # the characters that matched & the one that did not
+            s = min(s2[u], max(s1[u], rt.get(t[i - j], pmin + 1) - j - 1))
+            i += s
+            shifts += 1
+            j = 0
+            u = 0
+            m = ''
+    finally :
+        stats["shifts"] = stats.get("shifts", 0) + shifts
+        stats["shifted"] = stats.get("shifted", 0) + i - (pmin - 1)
+        stats["compared"] = stats.get("compared", 0) + compared
 
-# -- MAIN THREAD --
+def build(ps) :
+    ''' Input :  ps, a list of patterns
+        Result:  the trie of the reversed patterns and the tables of the algorithm are built, replacing the ones of
+                 the previous patterns: patterns, trie, parent, depth, isEndNode, pmin, pmax, rt, failure, set1,
+                 set2, s1 and s2 are changed '''
+    global patterns, trie, parent, depth, isEndNode, pmin, pmax, rt, failure, set1, set2, s1, s2
+    patterns = sorted(ps, key = len)
+    trie = [{}]
+    parent = [None]
+    depth = [0]
+    isEndNode = [False]
+    for p in patterns :
+        insert(trie, p[::-1]) # construct the trie with the reverse patterns
+    pmin = len(patterns[0])
+    pmax = len(patterns[-1])
+    # rt only needs the characters of the patterns, every other character shifts by pmin + 1
+    rt, failure, set1, set2, s1, s2 = preprocess(pmin, trie, '')
+    matchers.clear()
 
-trie = {
-    0: []
-}
+# the header of a cache file: a magic string with the byte order of the numbers after it, the amounts of
+# nodes, edges, rt entries, patterns & pattern characters, pmin & pmax
+header = struct.Struct('=4s7i')
+magic = b'CWZ' + sys.byteorder[0].upper().encode() # CWZL or CWZB
+
+def cacheFile(ps, directory) :
+    ''' Input :  ps, a list of patterns
+                 directory, the directory of the cache
+        Output:  the path of the cache file of ps in directory, named after a hash of the set of ps (in any order)
+                 & the format of the file '''
+    key = hashlib.sha256(magic + '\0'.join(sorted(ps)).encode('utf-8', 'surrogatepass'))
+    return os.path.join(directory, key.hexdigest() + '.cwz')
+
+def writeCache(file) :
+    ''' Input :  file, the path of a cache file
+        Data  :  patterns, trie, parent, depth, isEndNode, pmin, pmax, rt, s1, s2, as built by build
+        Result:  the automaton is written in file, as a header and arrays of 32 bit integers, where the children of
+                 node n are the characters chars[offsets[n]:offsets[n+1]] & the nodes children[offsets[n]:offsets[n+1]].
+                 The file is written next to its path & moved there, so a reader never sees half of it '''
+    offsets = array('i', [0])
+    chars = array('i')
+    children = array('i')
+    for node in trie :
+        chars.extend(ord(c) for c in node)
+        children.extend(node.values())
+        offsets.append(len(chars))
+    text = ''.join(patterns)
+    arrays = [offsets, chars, children,
+              array('i', [-1] + parent[1:]), array('i', depth), array('i', isEndNode), array('i', s1), array('i', s2),
+              array('i', (ord(c) for c in rt)), array('i', rt.values()),
+              array('i', (len(p) for p in patterns)), array('i', (ord(c) for c in text))]
+    temp = file + '.' + str(os.getpid())
+    with open(temp, 'wb') as out :
+        out.write(header.pack(magic, len(trie), len(chars), len(rt), len(patterns), len(text), pmin, pmax))
+        for a in arrays :
+            a.tofile(out)
+    os.replace(temp, file)
+
+def readCache(file) :
+    ''' Input :  file, the path of a cache file written by writeCache
+        Result:  the automaton of file replaces the one of the previous patterns, like build would, without any
+                 preprocessing. The file is memory-mapped: isEndNode, s1 & s2 are read from the map as they are
+                 and only the children of every node are turned into dictionaries. failure, set1 & set2 are not
+                 kept in the file and become None
+        Raises:  ValueError, if file is not a cache file of this format '''
+    global patterns, trie, parent, depth, isEndNode, pmin, pmax, rt, failure, set1, set2, s1, s2
+    with open(file, 'rb') as f :
+        data = mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ)
+    if len(data) < header.size or data[:4] != magic or (len(data) - header.size) % 4 != 0 :
+        raise ValueError("not a cache file") # or a truncated one
+    n,e,r,k,q,pmin,pmax = header.unpack_from(data)[1:]
+    ints = memoryview(data)[header.size:].cast('i')
+    if len(ints) != 6 * n + 1 + 2 * e + 2 * r + k + q :
+        raise ValueError("not a cache file")
+    sections = []
+    start = 0
+    for size in (n + 1, e, e, n, n, n, n, n, r, r, k, q) :
+        sections.append(ints[start:start + size])
+        start += size
+    offsets,chars,children,parents,depths,ends,s1,s2,rtChars,rtShifts,lengths,text = sections
+    trie = [dict(zip(map(chr, chars[offsets[u]:offsets[u + 1]]), children[offsets[u]:offsets[u + 1]])) for u in range(n)]
+    parent = [None] + parents[1:].tolist()
+    depth = depths.tolist()
+    isEndNode = ends
+    rt = dict(zip(map(chr, rtChars), rtShifts))
+    text = ''.join(map(chr, text))
+    patterns = []
+    start = 0
+    for size in lengths :
+        patterns.append(text[start:start + size])
+        start += size
+    failure = set1 = set2 = None
+    matchers.clear()
+
+def cachedBuild(ps, directory) :
+    ''' Input :  ps, a list of patterns
+                 directory, the directory of the cache
+        Output:  True if the automaton of ps was read from the cache, False if it was built & written in the cache
+        Result:  like build(ps) '''
+    file = cacheFile(ps, directory)
+    try :
+        readCache(file)
+        return True
+    except (FileNotFoundError, ValueError) : # not in the cache yet, or written by another format
+        pass
+    build(sorted(ps)) # the same automaton for the same set of patterns, whatever their order
+    os.makedirs(directory, exist_ok = True)
+    writeCache(file)
+    return False
+
+def scan(text, size = 1 << 20, lines = False, offset = 0, skip = 0, limit = None, stats = None) :
+    ''' Input :  text, an open text file
+                 size, the number of characters read at a time
+                 lines, whether to find the line & the column of every match, counted from the first character read
+                 offset, the index in the whole text of the first character read
+                 skip, the amount of characters at the start of text whose matches were reported already, they
+                 are read only for the matches that cross them
+                 limit, the amount of characters to read, or None to read till the end of text
+                 stats, a dictionary where the counts of CommentzWalter are added for every chunk, or None
+        Data  :  pmax, the length of the largest pattern
+        Output:  a generator of (m, i) tuples, or (m, i, line, column) tuples if lines, where m is the pattern and i the
+                 index it was found in the whole text, in order of the index where the match ends. The text is read in
+                 chunks of size characters, where every chunk starts with the last pmax - 1 characters of the previous
+                 one, so that the matches that cross two chunks are found too '''
+    keep = pmax - 1
+    tail = text.read(skip) if skip > 0 else '' # the end of the previous chunk
+    remaining = None if limit is None else limit - len(tail)
+    line = 1 # the line of tail[0]
+    lineStart = offset # the index where said line starts
+    while True :
+        chunk = text.read(size if remaining is None else min(size, remaining))
+        if not chunk : return
+        if remaining is not None :
+            remaining -= len(chunk)
+        t = tail + chunk
+        if lines :
+            newlines = [] # the indexes of the newlines in t
+            k = t.find('\n')
+            while k != -1 :
+                newlines.append(k)
+                k = t.find('\n', k + 1)
+        # the matches that end in tail were reported with the previous chunk
+        for m, i in CommentzWalter(t, len(tail), stats) :
+            if lines :
+                before = bisect_left(newlines, i) # the newlines before the match
+                start = newlines[before - 1] + 1 + offset if before else lineStart
+                yield m, offset + i, line + before, offset + i - start + 1
+            else :
+                yield m, offset + i
+        tail = t[max(0, len(t) - keep):] if keep > 0 else ''
+        consumed = len(t) - len(tail)
+        if lines :
+            before = bisect_left(newlines, consumed)
+            if before :
+                lineStart = newlines[before - 1] + 1 + offset
+            line += before
+        offset += consumed
+
+def summary(stats, preprocessing, scanning) :
+    ''' Input :  stats, a dictionary with the counts of CommentzWalter, or an empty one if they were not kept
+                 preprocessing, scanning, the seconds spent on building the tables & on searching the text
+        Output:  a dictionary with said seconds, the amount of shifts, their average length & the amount of
+                 characters compared, where the counts that were not kept are None '''
+    shifts = stats.get("shifts")
+    return {
+        "preprocessing_s" : preprocessing,
+        "scanning_s" : scanning,
+        "shifts" : shifts,
+        "average_shift" : stats["shifted"] / shifts if shifts else None,
+        "compared" : stats.get("compared"),
+    }
+
+def printStats(stats, preprocessing, scanning) :
+    ''' Input :  stats, preprocessing, scanning, like summary
+        Result:  the summary of said search is printed in stderr, one line per value that is known '''
+    for name, value in summary(stats, preprocessing, scanning).items() :
+        if value is not None :
+            print(name + ":", round(value, 6) if isinstance(value, float) else value, file = sys.stderr)
+
+
+def byteTables() :
+    ''' Data  :  trie, patterns, rt, pmin, the automaton of patterns, as built by build (from latin-1 strings, so that
+                 every character is a byte)
+        Output:  children, ends, shift, the tables of the byte engine, where children[n] is a dictionary with the children
+                 of node n keyed by the value of their byte, ends[n] is the number of the pattern in patterns that
+                 node n represents or -1, and shift[b] = rt[b] for every byte b '''
+    children = [{ord(c) : v for c, v in node.items()} for node in trie]
+    ends = [-1] * len(trie)
+    for k, p in enumerate(patterns) :
+        node = 0
+        for c in reversed(p) :
+            node = trie[node][c]
+        if ends[node] == -1 : # a pattern that is given twice keeps its first number
+            ends[node] = k
+    shift = [rt.get(chr(b), pmin + 1) for b in range(256)]
+    return children, ends, shift
 
-isEndNode = {
-    0 : False
+def scanBytes(t, tables, start = 0) :
+    ''' Input :  t, a bytes-like object (bytes, bytearray, memoryview or mmap) that we will look to match our patterns
+                 tables, the byteTables() of the patterns
+                 start, the first index of t where a match can end to be reported
+        Data  :  pmin, s1, s2
+        Output:  a generator of (k, i) tuples where k is the number of the pattern in patterns and i the index it
+                 was found in t, in order of the index where the match ends. It works like CommentzWalter, on the
+                 integer values of the bytes, without making any strings '''
+    children, ends, shift = tables
+    first, second = s1, s2 # local names are looked up faster than global ones
+    root = children[0].get
+    rootShift = [min(second[0], max(first[0], shift[b] - 1)) for b in range(256)] # the shift when no character matches
+    n = len(t)
+    i = pmin - 1
+    while i < n :
+        u = 0
+        j = 0
+        child = root(t[i])
+        while child is not None :
+            u = child
+            j += 1
+            if ends[u] >= 0 and i >= start :
+                yield ends[u], i - j + 1
+            if j > i : break # the start of t was reached
+            child = children[u].get(t[i - j])
+        if j > i :
+            j = i
+        if u == 0 : # no character matched, the most common case
+            i += rootShift[t[i]]
+        else :
+            i += min(second[u], max(first[u], shift[t[i - j]] - j - 1))
+
+def ahoTables() :
+    ''' Data  :  patterns, as built by build
+        Output:  goto, failure, out, lengths, the tables of the Aho-Corasick engine, where goto[n] is a dictionary with the
+                 children of node n in the trie of the patterns (not reversed) keyed by the value of their byte,
+                 failure is createFailure(goto), out[n] holds the numbers of the patterns that end at node n, the
+                 shortest first, and lengths[k] is the length of pattern k '''
+    goto = [{}]
+    ends = [-1]
+    for k, p in enumerate(patterns) :
+        node = 0
+        for c in p.encode('latin-1') :
+            child = goto[node].get(c)
+            if child is None :
+                child = len(goto)
+                goto.append({})
+                ends.append(-1)
+                goto[node][c] = child
+            node = child
+        if ends[node] == -1 : # a pattern that is given twice keeps its first number
+            ends[node] = k
+    failure = createFailure(goto)
+    out = [()] * len(goto)
+    for u in failure : # in Breadth-First order, so failure[u] is done before u
+        if u != 0 :
+            out[u] = out[failure[u]] + ((ends[u],) if ends[u] != -1 else ())
+    return goto, failure, out, [len(p) for p in patterns]
+
+def scanAho(t, tables, start = 0) :
+    ''' Input :  t, a bytes-like object that we will look to match our patterns
+                 tables, the ahoTables() of the patterns
+                 start, the first index of t where a match can end to be reported
+        Output:  a generator of (k, i) tuples like scanBytes, found by reading every byte of t once, so that the
+                 time does not depend on pmin '''
+    goto, failure, out, lengths = tables
+    root = [goto[0].get(c, 0) for c in range(256)] # the moves of the root, for every byte
+    u = 0
+    for i in range(len(t)) :
+        c = t[i]
+        while u != 0 and c not in goto[u] :
+            u = failure[u]
+        u = goto[u][c] if u != 0 else root[c]
+        if out[u] and i >= start :
+            for k in out[u] :
+                yield k, i - lengths[k] + 1
+
+def horspoolTables() :
+    ''' Data  :  patterns, as built by build, that are all the same pattern
+        Output:  pattern, k, shift, the tables of the Horspool engine, where pattern holds the bytes of the pattern,
+                 k its number in patterns and shift[b] how far the pattern can move when b is the byte under its end
+        Raises:  ValueError, if there are different patterns '''
+    if len(set(patterns)) != 1 :
+        raise ValueError("the horspool engine searches for a single pattern")
+    pattern = patterns[0].encode('latin-1')
+    m = len(pattern)
+    shift = [m] * 256
+    for index in range(m - 1) :
+        shift[pattern[index]] = m - 1 - index
+    return pattern, 0, shift
+
+def scanHorspool(t, tables, start = 0) :
+    ''' Input :  t, a bytes-like object that we will look to match our pattern
+                 tables, the horspoolTables() of the pattern
+                 start, the first index of t where a match can end to be reported
+        Output:  a generator of (k, i) tuples like scanBytes. Objects with a find method (bytes, bytearray, mmap)
+                 are searched with it, since it is a Horspool search written in C, the rest with the shift table '''
+    pattern, k, shift = tables
+    m = len(pattern)
+    i = max(0, start - m + 1) # the first index where a reported match can start
+    if hasattr(t, 'find') :
+        i = t.find(pattern, i)
+        while i != -1 :
+            yield k, i
+            i = t.find(pattern, i + 1)
+        return
+    n = len(t)
+    last = pattern[m - 1]
+    while i + m <= n :
+        c = t[i + m - 1]
+        if c == last :
+            j = m - 2
+            while j >= 0 and t[i + j] == pattern[j] :
+                j -= 1
+            if j < 0 :
+                yield k, i
+        i += shift[c]
+
+# the engines, name : (the function that builds its tables, the function that searches with them)
+engines = {
+    "commentz-walter" : (byteTables, scanBytes),
+    "aho-corasick" : (ahoTables, scanAho),
+    "horspool" : (horspoolTables, scanHorspool),
 }
+matchers = {} # the searching functions of the engines for the current patterns, built by matcher
+
+def chooseEngine() :
+    ''' Data  :  patterns, pmin, as built by build
+        Output:  engine, reason, the name of the engine that is expected to search the patterns the fastest & why.
+                 Horspool is used for a single pattern, Aho-Corasick when the shifts of Commentz-Walter would be
+                 short: a short pattern (every shift is at most pmin) or a lot of patterns over a small alphabet
+                 (most characters are in the patterns near their ends, so rt is small too). Commentz-Walter otherwise '''
+    count = len(set(patterns))
+    if count == 1 :
+        return "horspool", "a single pattern"
+    if pmin <= 3 :
+        return "aho-corasick", "pmin = " + str(pmin) + ", the shifts would be at most " + str(pmin)
+    tails = {c for p in patterns for c in p[-pmin:]} # the characters that rt does not let skip a whole pmin
+    if count > 4 * len(tails) :
+        return "aho-corasick", str(count) + " patterns over " + str(len(tails)) + " characters"
+    return "commentz-walter", "pmin = " + str(pmin) + ", " + str(count) + " patterns"
+
+def matcher(engine) :
+    ''' Input :  engine, the name of an engine
+        Output:  a function that takes a bytes-like object t (and start) & returns the generator of the engine for t,
+                 where the tables of the engine are built once for the current patterns '''
+    if engine not in matchers :
+        create, search = engines[engine]
+        tables = create()
+        matchers[engine] = lambda t, start = 0 : search(t, tables, start)
+    return matchers[engine]
 
-rpatterns = []
-for p in patterns :
-    rpatterns.append(p[::-1]) # reverse the patterns
-
-for i in rpatterns :
-    DFS(trie, 0, i) # construct the trie with the reverse patterns
-
-try :
-    with open(file) as text :
-        t = text.readline()
-        pmin = len(min(patterns, key = len))
-        rt = createRt(pmin, trie, t)
-        failure = createFailure(trie)
-        set1 = createSet1(failure)
-        set2 = createSet2(set1)
-        s1 = createS1(pmin, set1, 0)
-        s2 = createS2(pmin, set2, 0)
-        if args.v : # print s1 & s2 arrays if user specified it (-v)
-            for n in trie.keys() :
+def scanFile(file, search) :
+    ''' Input :  file, the path of a file
+                 search, a function from matcher
+        Output:  a generator of (k, i) tuples, like scanBytes, for the whole file, which is memory-mapped
+                 instead of read '''
+    with open(file, 'rb') as raw :
+        if os.fstat(raw.fileno()).st_size == 0 : return # an empty file can not be mapped
+        with mmap.mmap(raw.fileno(), 0, access = mmap.ACCESS_READ) as data :
+            yield from search(data)
+
+def scanRange(file, begin, end, size = 1 << 20, engine = None) :
+    ''' Input :  file, the path of a file
+                 begin, end, the byte range of file to search, where end is not included
+                 size, the number of characters read at a time
+                 engine, the name of the engine used to search the bytes of said range, or None to search its text
+                 with CommentzWalter
+        Data  :  pmax, the length of the largest pattern
+        Output:  matches, a list of (m, i) tuples of the patterns m that end in said range & the byte offset i
+                 where they start in file. The pmax - 1 bytes before begin are read too, for the matches that start
+                 in the previous range '''
+    start = max(0, begin - (pmax - 1))
+    with open(file, 'rb') as raw :
+        raw.seek(start)
+        if engine is not None :
+            data = raw.read(end - start)
+            return [(patterns[k], start + i) for k, i in matcher(engine)(data, begin - start)]
+        text = io.TextIOWrapper(raw, encoding = 'latin-1', newline = '') # every byte is a character
+        return list(scan(text, size, offset = start, skip = begin - start, limit = end - start))
+
+def lineColumns(file, indexes, size = 1 << 20, cursor = (1, 0, 0)) :
+    ''' Input :  file, the path of a file
+                 indexes, an ascending list of byte offsets in file
+                 size, the number of bytes read at a time
+                 cursor, a (line, lineStart, offset) tuple, where line is the line of the byte at offset and lineStart
+                 the offset where said line starts, so that file is read from offset, which is at most indexes[0]
+        Output:  a generator of the (line, column) of every index, found by counting the newlines of file in chunks '''
+    line,lineStart,chunkStart = cursor # chunkStart, the offset of chunk[0]
+    with open(file, 'rb') as raw :
+        raw.seek(chunkStart)
+        chunk = raw.read(size)
+        counted = 0 # the newlines of chunk before counted are counted in line
+        for i in indexes :
+            while i >= chunkStart + len(chunk) and chunk :
+                line += chunk.count(b'\n', counted)
+                k = chunk.rfind(b'\n', counted)
+                if k != -1 :
+                    lineStart = chunkStart + k + 1
+                chunkStart += len(chunk)
+                counted = 0
+                chunk = raw.read(size)
+            local = i - chunkStart
+            line += chunk.count(b'\n', counted, local)
+            k = chunk.rfind(b'\n', counted, local)
+            if k != -1 :
+                lineStart = chunkStart + k + 1
+            counted = local
+            yield line, i - lineStart + 1
+
+def batchFiles(path) :
+    ''' Input :  path, a directory or a glob pattern
+        Output:  the sorted list of the files in said directory, or of the files that match said pattern '''
+    if os.path.isdir(path) :
+        path = os.path.join(path, "*")
+    return sorted(f for f in glob(path) if os.path.isfile(f))
+
+def batchRanges(files, rangeSize) :
+    ''' Input :  files, a list of paths
+                 rangeSize, the amount of bytes of every range
+        Output:  ranges, a list of (file, begin, end) byte ranges that cover every file, in order '''
+    ranges = []
+    for file in files :
+        size = os.path.getsize(file)
+        for begin in range(0, max(size, 1), rangeSize) : # an empty file gets an empty range, to print its name
+            ranges.append((file, begin, min(size, begin + rangeSize)))
+    return ranges
+
+def initWorker(file) :
+    ''' Input :  file, the path of a cache file
+        Result:  the automaton of file is loaded in a worker process that was not forked from the one that built it '''
+    readCache(file)
+
+def batch(path, workers = None, rangeSize = 1 << 24, lines = False, engine = None) :
+    ''' Input :  path, a directory or a glob pattern of files
+                 workers, the number of processes used, or None for one per cpu
+                 rangeSize, the amount of bytes of every file that a worker searches at a time
+                 lines, whether to print the line & the column of every match
+                 engine, the name of the engine the workers search the bytes of the files with, or None for the text
+                 search of CommentzWalter
+        Data  :  the automaton of the patterns, as built by build or cachedBuild
+        Result:  every file is split in byte ranges, that are searched in a process pool. The workers are forked, so
+                 they share the automaton with this process, or load it from a memory-mapped cache file where fork
+                 is not available. The matches are printed in the order of the files, each one after a "==> file <=="
+                 line, and in the order of the ranges, so the output is the same for any number of workers.
+                 The throughput is printed in stderr '''
+    files = batchFiles(path)
+    ranges = batchRanges(files, rangeSize)
+    workers = workers or os.cpu_count() or 1
+    temp = None
+    if "fork" in multiprocessing.get_all_start_methods() :
+        options = {"mp_context" : multiprocessing.get_context("fork")}
+    else :
+        temp = tempfile.mkdtemp()
+        writeCache(os.path.join(temp, "patterns.cwz"))
+        options = {"initializer" : initWorker, "initargs" : (os.path.join(temp, "patterns.cwz"),)}
+    count = 0
+    total = 0
+    begin = perf_counter()
+    try :
+        with ProcessPoolExecutor(workers, **options) as pool :
+            # map returns the results in the order of ranges
+            results = pool.map(scanRange, *zip(*ranges), repeat(1 << 20), repeat(engine)) if ranges else []
+            current = None
+            for (file, start, end), matches in zip(ranges, results) :
+                if file != current :
+                    sys.stdout.write("==> " + file + " <==\n")
+                    current = file
+                    cursor = (1, 0, 0)
+                total += end - start
+                count += len(matches)
+                if lines and matches :
+                    # the matches of the next range start after its first byte, so the newlines are counted once
+                    # for the whole file, from a cursor at said byte
+                    after = max(0, end - (pmax - 1))
+                    indexes = sorted({i for m, i in matches} | {after})
+                    where = dict(zip(indexes, lineColumns(file, indexes, cursor = cursor)))
+                    cursor = (where[after][0], after - where[after][1] + 1, after)
+                for m, i in matches :
+                    m = m.encode('latin-1').decode()
+                    if lines :
+                        print(m, ":", i, ":", str(where[i][0]) + ":" + str(where[i][1]))
+                    else :
+                        print(m, ":", i)
+    finally :
+        if temp is not None :
+            os.remove(os.path.join(temp, "patterns.cwz"))
+            os.rmdir(temp)
+    elapsed = perf_counter() - begin
+    print(len(files), "files,", total, "bytes,", count, "matches in", round(elapsed,2), "s,",
+          round(total / elapsed / (1 << 20), 2) if elapsed else 0, "MiB/s", file = sys.stderr)
+
+
+# -- MAIN THREAD --
+
+def main() :
+    ''' Result:  the patterns of the command line are matched in the whole file of the command line, which is read in
+                 chunks, and every match is printed as soon as it is found '''
+    # add switches to allow user choices of execution in cli
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-v', action = 'store_true', help = 'print the s1 & s2 arrays along the results')
+    parser.add_argument('-l', action = 'store_true', help = 'print the line & the column of every match')
+    parser.add_argument('--cache', metavar = 'DIR', help = 'keep the preprocessed patterns in DIR & reuse them in the next runs')
+    parser.add_argument('--batch', action = 'store_true', help = 'the file is a directory / glob pattern of files, searched in parallel')
+    parser.add_argument('-j', dest = 'workers', type = int, help = 'with --batch, the number of processes used')
+    parser.add_argument('--bytes', action = 'store_true', help = 'search the bytes of the memory-mapped file, with the byte engine')
+    parser.add_argument('--engine', choices = ['auto'] + list(engines),
+                        help = 'search the bytes of the files with this engine, auto chooses one for the patterns')
+    parser.add_argument('--stats', action = 'store_true',
+                        help = 'print the seconds of preprocessing & searching, and the shifts & comparisons of the search')
+    parser.add_argument('tinput', nargs='*', action = 'store', help = 'match the given strings in the file')
+    args = parser.parse_args()
+
+    ps = args.tinput[0:len(args.tinput) - 1] # the patterns
+    if len(ps) < 1:
+        exit("invalid input. Program termination")
+    if ".txt" not in args.tinput[-1] and not args.batch :
+        exit("invalid file input. Program termination")
+    file = args.tinput[-1] # the file that contains the text
+
+    # the text is read as latin-1, so that every byte is a character & the indexes are byte offsets,
+    # and the patterns are turned into the same characters as their utf-8 bytes
+    ps = [p.encode().decode('latin-1') for p in ps]
+    begin = perf_counter()
+    if args.cache is None :
+        build(ps)
+    else :
+        cachedBuild(ps, args.cache)
+    preprocessing = perf_counter() - begin
+    engine = args.engine
+    if engine == "auto" :
+        engine, reason = chooseEngine()
+        print("engine:", engine, "(" + reason + ")", file = sys.stderr)
+    elif engine is None and args.bytes :
+        engine = "commentz-walter"
+    if engine == "horspool" and len(set(patterns)) != 1 :
+        exit("the horspool engine searches for a single pattern. Program termination")
+    if args.batch :
+        if args.v :
+            for n in range(len(trie)) :
                 print(n, ": ", s1[n], "," , s2[n], sep = "")
-        q = CommentzWalter(t)
-        for tuple in q : # print the patterns and where they were found
-            print(tuple[0], ":", tuple[1])
-except FileNotFoundError :
-    print("404: File not Found")
+        begin = perf_counter()
+        batch(file, args.workers, lines = args.l, engine = engine)
+        if args.stats :
+            printStats({}, preprocessing, perf_counter() - begin)
+        return
+    stats = {} if args.stats and engine is None else None # the counts are kept by the text search only
+    begin = perf_counter()
+    try :
+        if engine is not None :
+            if args.v : # print s1 & s2 arrays if user specified it (-v)
+                for n in range(len(trie)) :
+                    print(n, ": ", s1[n], "," , s2[n], sep = "")
+            names = [p.encode('latin-1').decode() for p in patterns]
+            matches = scanFile(file, matcher(engine))
+            if args.l : # the lines are counted in order of the offsets, after the search
+                matches = list(matches)
+                indexes = sorted({i for k, i in matches})
+                where = dict(zip(indexes, lineColumns(file, indexes)))
+            for k, i in matches :
+                if args.l :
+                    print(names[k], ":", i, ":", str(where[i][0]) + ":" + str(where[i][1]))
+                else :
+                    print(names[k], ":", i)
+            if args.stats :
+                printStats({}, preprocessing, perf_counter() - begin)
+            return
+        with open(file, encoding = 'latin-1', newline = '') as text :
+            if args.v : # print s1 & s2 arrays if user specified it (-v)
+                for n in range(len(trie)) :
+                    print(n, ": ", s1[n], "," , s2[n], sep = "")
+            for match in scan(text, lines = args.l, stats = stats) : # print the patterns and where they were found
+                m = match[0].encode('latin-1').decode()
+                if args.l :
+                    print(m, ":", match[1], ":", str(match[2]) + ":" + str(match[3]))
+                else :
+                    print(m, ":", match[1])
+        if args.stats :
+            printStats(stats, preprocessing, perf_counter() - begin)
+    except FileNotFoundError :
+        print("404: File not Found")
+
+if __name__ == "__main__" :
+    main()